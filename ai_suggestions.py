@@ -1,13 +1,197 @@
 """
-Importing necessary libraries
+Module for generating rap lyrics with GPT-2.
+
+The model is owned by a resident inference service. It is loaded on first
+use, or earlier by warm_up(), and then serves generation requests from a
+queue on its own thread, so importing this module stays cheap.
 """
-from transformers import GPT2LMHeadModel, GPT2Tokenizer
-import torch
+from concurrent.futures import CancelledError, Future
+import queue
+import re
+import threading
+import time
+
+import config
+from inference_backends import load_backend
+from prefix_cache import PrefixCache
+from rhyme_detector import rhyme_key
+from syllable_counter import count_syllables_in_line
 
-# Load the model and tokenizer
 MODEL_NAME = "gpt2"
-tokenizer = GPT2Tokenizer.from_pretrained(MODEL_NAME)
-model = GPT2LMHeadModel.from_pretrained(MODEL_NAME)
+MAX_NEW_TOKENS = 100  # Generate up to 100 new tokens
+FLOW_CONTEXT_LINES = 4  # Verse lines a candidate's flow is compared with
+
+
+class LineStreamer:
+    """Collects generated tokens and hands out complete lines.
+
+    The model calls put() with the prompt first and then with each new
+    token; end() is called once generation stops. Iterating the streamer
+    yields each non-empty, stripped line as soon as its newline appears.
+    Generation should stop once done() is True: after max_lines lines, or
+    when the cancel event is set.
+    """
+
+    def __init__(self, max_lines, cancel_event=None):
+        self.max_lines = max_lines
+        self.cancel_event = cancel_event or threading.Event()
+        self.tokenizer = None
+        self.token_ids = []
+        self.consumed = 0
+        self.line_count = 0
+        self.prompt_seen = False
+        self.finished = False
+        self.lines = queue.Queue()
+
+    def done(self):
+        """Returns True once no more lines are wanted."""
+        return self.cancel_event.is_set() or self.line_count >= self.max_lines
+
+    def put(self, value):
+        """Receives the prompt, then newly generated tokens."""
+        if not self.prompt_seen:
+            self.prompt_seen = True
+            return
+        self.token_ids.extend(value.reshape(-1).tolist())
+        # Decode all new tokens, so byte-pair merges across tokens are kept
+        text = self.tokenizer.decode(self.token_ids, skip_special_tokens=True)
+        newline = text.rfind('\n')
+        if newline >= self.consumed:
+            self._emit(text[self.consumed:newline].split('\n'))
+            self.consumed = newline + 1
+
+    def end(self):
+        """Flushes the last partial line and closes the stream."""
+        if self.finished:
+            return
+        self.finished = True
+        if self.tokenizer is not None and self.token_ids:
+            text = self.tokenizer.decode(self.token_ids,
+                                         skip_special_tokens=True)
+            self._emit(text[self.consumed:].split('\n'))
+        self.lines.put(None)
+
+    def _emit(self, lines):
+        for line in lines:
+            if line.strip() and not self.done():
+                self.lines.put(line.strip())
+                self.line_count += 1
+
+    def __iter__(self):
+        while True:
+            line = self.lines.get()
+            if line is None:
+                return
+            yield line
+
+
+class InferenceService:
+    """Lazily loads the model and serves generation jobs from a queue.
+
+    A job is a callable taking (model, tokenizer); submit() returns a
+    Future holding its result. A job whose cancel event is set before it
+    starts is skipped, and its Future is cancelled.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, backend=config.AI_BACKEND):
+        self.model_name = model_name
+        self.backend = backend
+        self.model = None
+        self.tokenizer = None
+        self.state = 'idle'
+        self.error = None
+        self.load_time = None
+        self.served = 0
+        self.jobs = queue.Queue()
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def start(self):
+        """Starts loading the model in the background, if not started yet."""
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run,
+                                               name='inference-service',
+                                               daemon=True)
+                self.worker.start()
+
+    def submit(self, job, cancel_event=None):
+        """Queues a job for the model and returns its Future."""
+        future = Future()
+        self.jobs.put((job, future, cancel_event))
+        self.start()
+        return future
+
+    def wait_until_ready(self, timeout=None):
+        """Blocks until the model is loaded; returns True if it is ready."""
+        self.ready.wait(timeout)
+        return self.state == 'ready'
+
+    def status(self):
+        """Returns the health of the service and how long loading took."""
+        return {
+            'state': self.state,
+            'ready': self.state == 'ready',
+            'backend': self.backend,
+            'load_time': self.load_time,
+            'error': str(self.error) if self.error else None,
+            'pending': self.jobs.qsize(),
+            'served': self.served
+        }
+
+    def _load(self):
+        """Loads the tokenizer and model, recording the load time."""
+        self.state = 'loading'
+        started = time.perf_counter()
+        print(f"Loading model '{self.model_name}' "
+              f"({self.backend} backend)...")
+        try:
+            self.model, self.tokenizer = load_backend(self.backend,
+                                                      self.model_name)
+        except Exception as e:
+            self.error = e
+            self.state = 'error'
+            print(f"Error loading model: {e}")
+        else:
+            self.state = 'ready'
+        self.load_time = time.perf_counter() - started
+        print(f"Model load finished in {self.load_time:.2f}s "
+              f"(state: {self.state})")
+        self.ready.set()
+
+    def _run(self):
+        """Loads the model, then serves queued jobs forever."""
+        self._load()
+        while True:
+            job, future, cancel_event = self.jobs.get()
+            if cancel_event is not None and cancel_event.is_set():
+                future.cancel()
+            if not future.set_running_or_notify_cancel():
+                continue
+            if self.state != 'ready':
+                future.set_exception(
+                    RuntimeError(f"Model is not available: {self.error}"))
+                continue
+            try:
+                future.set_result(job(self.model, self.tokenizer))
+            except Exception as e:
+                future.set_exception(e)
+            self.served += 1
+
+
+service = InferenceService()
+prefix_cache = PrefixCache()
+
+
+def warm_up():
+    """Starts loading the model in the background."""
+    service.start()
+
+
+def get_status():
+    """Returns the status of the inference service."""
+    return service.status()
 
 
 def generate_rap_lyrics(prompt, current_lyrics=None, max_lines=10):
@@ -22,31 +206,12 @@ def generate_rap_lyrics(prompt, current_lyrics=None, max_lines=10):
         # Combine the current lyrics and the new prompt for context if provided
         combined_input = f"{current_lyrics}\n{prompt}" if current_lyrics else prompt
 
-        # Tokenize the input text
-        input_ids = tokenizer.encode(combined_input, return_tensors="pt", truncation=True, max_length=512)
-
-        # Generate new tokens
-        with torch.no_grad():
-            output = model.generate(
-                input_ids,
-                max_length=input_ids.shape[1] + 100,  # Generate up to 100 new tokens
-                num_return_sequences=1,
-                no_repeat_ngram_size=2,
-                do_sample=True,
-                top_k=50,
-                top_p=0.95,
-                temperature=0.7,
-                pad_token_id=tokenizer.eos_token_id,
-                attention_mask=input_ids.new_ones(input_ids.shape)
-            )
-
-        # Decode the generated tokens to text
-        generated_text = tokenizer.decode(output[0], skip_special_tokens=True)
+        new_text = service.submit(
+            lambda model, tokenizer: _generate(model, tokenizer,
+                                               combined_input)[0]
+        ).result().strip()
 
-        print(f"Raw generated text: {generated_text}")
-
-        # Extract only the newly generated part
-        new_text = generated_text[len(combined_input):].strip()
+        print(f"Raw generated text: {new_text}")
 
         if not new_text:
             return "No new lyrics generated. Please try again."
@@ -62,6 +227,183 @@ def generate_rap_lyrics(prompt, current_lyrics=None, max_lines=10):
         return f"Error generating lyrics: {str(e)}"
 
 
+def stream_rap_lyrics(prompt, current_lyrics=None, max_lines=10,
+                      cancel_event=None):
+    """
+    Generates rap lyrics, yielding each line as soon as it is complete.
+
+    Generation stops early once max_lines lines are done, when the
+    cancel event is set, or when the caller stops iterating.
+    """
+    combined_input = f"{current_lyrics}\n{prompt}" if current_lyrics else prompt
+    streamer = LineStreamer(max_lines, cancel_event)
+    future = service.submit(
+        lambda model, tokenizer: _generate(model, tokenizer, combined_input,
+                                           streamer=streamer),
+        cancel_event=streamer.cancel_event
+    )
+    # Close the stream even if the job fails before generating anything
+    future.add_done_callback(lambda _: streamer.end())
+    try:
+        yield from streamer
+    except GeneratorExit:
+        # The caller stopped reading, so stop generating as well
+        streamer.cancel_event.set()
+        raise
+    if (future.done() and not future.cancelled()
+            and future.exception() is not None):
+        raise future.exception()
+
+
+def generate_candidates(prompt, current_lyrics=None, max_lines=10,
+                        num_candidates=config.AI_CANDIDATES,
+                        cancel_event=None):
+    """
+    Generates several suggestions in one batched model call.
+
+    Returns the non-empty suggestions ranked best first by how well they
+    keep the flow of the current lyrics (see score_candidate). Setting the
+    cancel event stops the generation of every sequence, or skips it if it
+    has not started yet; the result is then empty.
+    """
+    print(f"Generating {num_candidates} candidates with prompt: {prompt}")
+    combined_input = f"{current_lyrics}\n{prompt}" if current_lyrics else prompt
+    future = service.submit(
+        lambda model, tokenizer: _generate(
+            model, tokenizer, combined_input,
+            num_return_sequences=num_candidates, cancel_event=cancel_event),
+        cancel_event=cancel_event
+    )
+    try:
+        texts = future.result()
+    except CancelledError:
+        return []
+    if cancel_event is not None and cancel_event.is_set():
+        return []
+
+    candidates = {format_rap_lyrics(text.strip(), max_lines) for text in texts}
+    candidates.discard('')
+    ranked = sorted(candidates, reverse=True,
+                    key=lambda candidate: score_candidate(candidate,
+                                                          current_lyrics))
+    print(f"Ranked candidates: {ranked}")
+    return ranked
+
+
+def score_candidate(candidate, current_lyrics=None):
+    """
+    Scores how well a suggestion keeps the flow of the current lyrics.
+
+    Rewards line endings that rhyme with the last lines of the verse or
+    with each other, and penalizes lines whose syllable count strays from
+    the verse's average syllables per bar.
+    """
+    lines = [line for line in candidate.split('\n') if line.strip()]
+    if not lines:
+        return float('-inf')
+    verse = [line for line in (current_lyrics or '').split('\n')
+             if line.strip()][-FLOW_CONTEXT_LINES:]
+
+    verse_keys = {rhyme_key(word) for word in map(last_word, verse) if word}
+    end_keys = [rhyme_key(word) for word in map(last_word, lines) if word]
+    rhyming = sum(1 for index, key in enumerate(end_keys)
+                  if key in verse_keys or key in end_keys[:index])
+    rhyme_score = rhyming / len(lines)
+
+    syllable_penalty = 0.0
+    if verse:
+        target = sum(map(count_syllables_in_line, verse)) / len(verse)
+        if target:
+            syllable_penalty = sum(
+                abs(count_syllables_in_line(line) - target)
+                for line in lines) / (len(lines) * target)
+
+    return rhyme_score - syllable_penalty
+
+
+def last_word(line):
+    """Returns the last word of a line in lowercase, or ''."""
+    words = re.findall(r'\b\w+\b', line.lower())
+    return words[-1] if words else ''
+
+
+def _generate(model, tokenizer, combined_input, streamer=None,
+              num_return_sequences=1, cancel_event=None):
+    """Runs the model on the input and returns the decoded new text.
+
+    Returns one decoded text per returned sequence, without the prompt.
+
+    With a LineStreamer, tokens are streamed to it as they are generated
+    and generation stops as soon as the streamer is done. Setting the
+    cancel event stops the generation of every sequence. The attention
+    cache of the longest previously seen prompt prefix is reused, so only
+    the new tokens of the prompt are encoded.
+    """
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class StreamerDone(StoppingCriteria):
+        """Stops generation once the streamer wants no more lines."""
+
+        def __call__(self, input_ids, scores, **kwargs):
+            return streamer.done()
+
+    class Cancelled(StoppingCriteria):
+        """Stops generation once the request is cancelled."""
+
+        def __call__(self, input_ids, scores, **kwargs):
+            return cancel_event.is_set()
+
+    extra_args = {}
+    stopping_criteria = []
+    if streamer is not None:
+        streamer.tokenizer = tokenizer
+        extra_args['streamer'] = streamer
+        stopping_criteria.append(StreamerDone())
+    if cancel_event is not None:
+        stopping_criteria.append(Cancelled())
+    if stopping_criteria:
+        extra_args['stopping_criteria'] = StoppingCriteriaList(stopping_criteria)
+
+    # Tokenize the input text
+    input_ids = tokenizer.encode(combined_input, return_tensors="pt", truncation=True, max_length=512)
+    prompt_ids = input_ids[0].tolist()
+
+    # Only PyTorch models accept a reused attention cache
+    reuse_cache = isinstance(model, torch.nn.Module)
+    cached_length, past_key_values = (
+        prefix_cache.lookup(prompt_ids, num_return_sequences)
+        if reuse_cache else (0, None))
+    if past_key_values is not None:
+        print(f"Reusing attention cache for {cached_length} of "
+              f"{len(prompt_ids)} prompt tokens")
+        extra_args['past_key_values'] = past_key_values
+
+    # Generate new tokens
+    with torch.no_grad():
+        output = model.generate(
+            input_ids,
+            max_length=input_ids.shape[1] + MAX_NEW_TOKENS,
+            num_return_sequences=num_return_sequences,
+            no_repeat_ngram_size=2,
+            do_sample=True,
+            top_k=50,
+            top_p=0.95,
+            temperature=0.7,
+            pad_token_id=tokenizer.eos_token_id,
+            attention_mask=input_ids.new_ones(input_ids.shape),
+            return_dict_in_generate=True,
+            **extra_args
+        )
+
+    if reuse_cache and output.past_key_values is not None:
+        prefix_cache.store(prompt_ids, output.past_key_values)
+
+    # Decode the generated tokens to text
+    return [tokenizer.decode(sequence, skip_special_tokens=True)
+            for sequence in output.sequences[:, input_ids.shape[1]:]]
+
+
 def format_rap_lyrics(generated_text, max_lines):
     """
     Formats the generated text into rap lyrics.
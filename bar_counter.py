@@ -0,0 +1,65 @@
+"""
+Module for incrementally counting bars and syllables in the lyrics input.
+"""
+
+from tokenizer import changed_line_range, tokenize, tokenize_line
+
+
+class BarCounter:
+    """Keeps per-line syllable totals and recounts only the edited lines.
+
+    Each call to update() compares the new lines with the previous ones,
+    skips the unchanged head and tail of the document and recounts only
+    the lines in between, so the running totals cost O(edited lines).
+    """
+
+    def __init__(self, count_word_syllables):
+        self.count_word_syllables = count_word_syllables
+        self.lines = []
+        self.line_syllables = []
+        self.syllables = 0
+
+    @property
+    def bars(self):
+        """Returns the number of bars (lines) in the last counted text."""
+        return len(self.lines)
+
+    @property
+    def avg_syllables(self):
+        """Returns the average number of syllables per bar."""
+        return self.syllables / self.bars if self.bars > 0 else 0
+
+    def count_line(self, line, tokens=None):
+        """Returns the syllable total of a single line."""
+        if tokens is None:
+            tokens = tokenize_line(line)
+        return sum(self.count_word_syllables(word) for _, _, word in tokens)
+
+    def update(self, text):
+        """Updates the running totals for the new text and returns them."""
+        table = tokenize(text)
+        new_lines = table.lines
+
+        # Skip the lines that are unchanged at the start and end
+        start, old_end, new_end = changed_line_range(self.lines, new_lines)
+
+        removed = self.line_syllables[start:old_end]
+        added = [self.count_line(line, tokens) for line, tokens
+                 in zip(new_lines[start:new_end],
+                        table.line_tokens[start:new_end])]
+        self.syllables += sum(added) - sum(removed)
+        self.line_syllables[start:old_end] = added
+        self.lines = new_lines
+
+        return self.bars, self.syllables, self.avg_syllables
+
+    def reset(self):
+        """Forgets all cached line totals."""
+        self.lines = []
+        self.line_syllables = []
+        self.syllables = 0
+
+    def format_label(self):
+        """Returns the counter label text for the current totals."""
+        return (f"Bars: {self.bars} | Syllables: {self.syllables} | "
+                f"AvgSyl: {self.avg_syllables:.2f}")
@@ -0,0 +1,113 @@
+"""
+Benchmark of the import time of the app, checked against a budget.
+
+Imports a module (main by default) in a fresh Python process with
+-X importtime and reports which top-level packages the time went to. The
+check fails when a heavy dependency that should be imported lazily shows
+up, or when the import time outside Kivy exceeds the budget, so cold start
+of the editor stays bounded by Kivy alone.
+
+Usage:
+    python benchmark_imports.py [--module main] [--budget 150] [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+import config
+
+BASELINE_PACKAGES = ('kivy',)  # Import time the budget does not cover
+
+
+def measure_imports(module):
+    """Imports a module in a fresh process and returns its import times.
+
+    Returns a list of (package, self_us, cumulative_us) tuples, in the
+    order the -X importtime report lists them.
+    """
+    environment = dict(os.environ, KIVY_NO_ARGS='1', KIVY_NO_CONSOLELOG='1')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=False, env=environment,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing '{module}' failed:\n"
+                           f"{completed.stderr}")
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # The header line
+        imports.append((fields[2].strip(), self_us, cumulative_us))
+    return imports
+
+
+def summarize(imports):
+    """Returns the total self time in microseconds per top-level package."""
+    totals = {}
+    for name, self_us, _ in imports:
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+
+def check_budget(imports, budget_ms, lazy_modules=config.LAZY_MODULES):
+    """Returns the list of budget violations; empty when the check passes."""
+    totals = summarize(imports)
+    problems = [f"'{package}' is imported eagerly but should be lazy"
+                for package in lazy_modules if package in totals]
+    outside_baseline = sum(time for package, time in totals.items()
+                           if package not in BASELINE_PACKAGES) / 1000
+    if outside_baseline > budget_ms:
+        problems.append(f"Import time outside Kivy is "
+                        f"{outside_baseline:.0f} ms, over the budget of "
+                        f"{budget_ms} ms")
+    return problems
+
+
+def print_report(module, imports, top):
+    """Prints the total import time and the slowest packages."""
+    totals = summarize(imports)
+    total = sum(totals.values()) / 1000
+    baseline = sum(totals.get(package, 0)
+                   for package in BASELINE_PACKAGES) / 1000
+    print(f"Importing '{module}' took {total:.0f} ms "
+          f"({baseline:.0f} ms in {', '.join(BASELINE_PACKAGES)}, "
+          f"{total - baseline:.0f} ms elsewhere)")
+    print(f"{'package':<24} {'ms':>8}")
+    for package, time in sorted(totals.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<24} {time / 1000:8.1f}")
+
+
+def main():
+    """Runs the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--module', default='main',
+                        help="Module whose import is measured")
+    parser.add_argument('--budget', type=float,
+                        default=config.IMPORT_TIME_BUDGET_MS,
+                        help="Allowed import time outside Kivy, in ms")
+    parser.add_argument('--top', type=int, default=15,
+                        help="Number of slowest packages to show")
+    args = parser.parse_args()
+
+    imports = measure_imports(args.module)
+    print_report(args.module, imports, args.top)
+    problems = check_budget(imports, args.budget)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"OK: within the import budget of {args.budget:g} ms")
+
+
+if __name__ == "__main__":
+    main()
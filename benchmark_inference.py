@@ -0,0 +1,136 @@
+"""
+Benchmark of the GPT-2 inference backends on CPU.
+
+Each backend runs in its own process, so its memory use is measured in
+isolation. For every backend the report shows the load time, the latency
+of a fixed-length greedy generation, the generation speed in tokens per
+second, the peak resident memory, and whether the greedy output matches
+the full precision 'torch' backend.
+
+Usage:
+    python benchmark_inference.py [--backends torch int8 onnx]
+                                  [--tokens 64] [--runs 3]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from inference_backends import BACKENDS, load_backend
+
+MODEL_NAME = "gpt2"
+PROMPT = ("Continue the rap lyrics: I came up from the bottom, now I'm "
+          "running the block\nEvery verse that I write is a tick on the "
+          "clock\n")
+
+
+def peak_rss_mb():
+    """Returns the peak resident memory of this process in MB, or None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_backend(backend, tokens, runs):
+    """Benchmarks one backend in this process and returns its results."""
+    import torch
+
+    started = time.perf_counter()
+    model, tokenizer = load_backend(backend, MODEL_NAME)
+    load_time = time.perf_counter() - started
+
+    input_ids = tokenizer.encode(PROMPT, return_tensors="pt")
+    generate_args = {
+        'max_new_tokens': tokens,
+        'min_new_tokens': tokens,
+        'do_sample': False,
+        'pad_token_id': tokenizer.eos_token_id,
+        'attention_mask': input_ids.new_ones(input_ids.shape)
+    }
+
+    with torch.no_grad():
+        # Warm-up run, so one-time setup is not counted as latency
+        model.generate(input_ids, **generate_args)
+        latencies = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            output = model.generate(input_ids, **generate_args)
+            latencies.append(time.perf_counter() - started)
+
+    latency = sorted(latencies)[len(latencies) // 2]
+    new_tokens = output.shape[1] - input_ids.shape[1]
+    return {
+        'backend': backend,
+        'load_time': load_time,
+        'latency': latency,
+        'tokens_per_second': new_tokens / latency,
+        'peak_rss_mb': peak_rss_mb(),
+        'text': tokenizer.decode(output[0][input_ids.shape[1]:],
+                                 skip_special_tokens=True)
+    }
+
+
+def run_in_subprocess(backend, tokens, runs):
+    """Benchmarks one backend in a fresh Python process."""
+    completed = subprocess.run(
+        [sys.executable, __file__, '--worker', backend,
+         '--tokens', str(tokens), '--runs', str(runs)],
+        capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        print(f"Backend '{backend}' failed:\n{completed.stderr}")
+        return None
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_report(results):
+    """Prints a comparison table of the benchmark results."""
+    baseline = next((r for r in results if r['backend'] == 'torch'), None)
+    print(f"{'backend':<8} {'load s':>8} {'latency s':>10} {'tok/s':>8} "
+          f"{'peak MB':>8} {'speedup':>8}  same output")
+    for result in results:
+        speedup = (baseline['latency'] / result['latency']
+                   if baseline else float('nan'))
+        same = ('-' if baseline is None
+                else 'yes' if result['text'] == baseline['text'] else 'no')
+        rss = result['peak_rss_mb']
+        rss_text = f"{rss:8.0f}" if rss is not None else f"{'n/a':>8}"
+        print(f"{result['backend']:<8} {result['load_time']:8.2f} "
+              f"{result['latency']:10.3f} {result['tokens_per_second']:8.1f} "
+              f"{rss_text} {speedup:7.2f}x  {same}")
+
+
+def main():
+    """Runs the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS),
+                        choices=list(BACKENDS))
+    parser.add_argument('--tokens', type=int, default=64,
+                        help="New tokens generated per run")
+    parser.add_argument('--runs', type=int, default=3,
+                        help="Timed runs per backend")
+    parser.add_argument('--worker', choices=list(BACKENDS),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.tokens, args.runs)))
+        return
+
+    results = []
+    for backend in args.backends:
+        print(f"Benchmarking '{backend}'...")
+        result = run_in_subprocess(backend, args.tokens, args.runs)
+        if result is not None:
+            results.append(result)
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
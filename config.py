@@ -34,3 +34,55 @@ LOG_FILE = "rap_writer.log"  # Log file name
 # --- Other Settings ---
 MAX_LYRICS_LENGTH = 1000
 # Maximum number of characters allowed in lyrics input
+UNDO_HISTORY_BYTES = 1024 * 1024  # Memory kept for undo/redo edits
+UNDO_CAPTURE_DELAY = 0.5  # Seconds of no typing before the text is saved
+UNDO_MERGE_WINDOW = 2.0  # Seconds within which saves join one undo entry
+
+# --- Syllable Settings ---
+SYLLABLE_CACHE_SIZE = 4096  # Maximum number of words kept in syllable cache
+PRONUNCIATION_DICT_FILE = "pronunciations.bin"
+# Compiled pronunciation dictionary, built with pronunciation_dict.py
+
+# --- Rhyme Settings ---
+RHYME_BACKENDS = ('local', 'datamuse')
+# Rhyme backends in the order they are tried; 'datamuse' needs network access
+MAX_RHYME_RESULTS = 100  # Maximum number of rhymes returned per word
+RESPONSE_CACHE_FILE = "response_cache.sqlite3"  # Cache of API responses
+RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds before a response expires
+RESPONSE_CACHE_MAX_BYTES = 8 * 1024 * 1024  # Size cap of the response cache
+DATAMUSE_POOL_SIZE = 8  # Keep-alive connections kept open to Datamuse
+DATAMUSE_TIMEOUT = (3.05, 5)  # Connect and read timeout of each request
+DATAMUSE_BATCH_DEADLINE = 8  # Seconds allowed for a whole batch of requests
+MAX_COMBINED_RHYMES = 20  # Multi-word rhymes shown per phrase length
+MAX_COMBINER_EXPANSIONS = 2000  # Work cap of the multi-word rhyme search
+
+# --- AI Settings ---
+KV_CACHE_MAX_TOKENS = 1536  # Prompt tokens whose attention cache is kept
+AI_CANDIDATES = 4  # Alternative suggestions generated in one batched call
+AI_BACKEND = "torch"
+# Inference backend: 'torch' (fp32), 'int8' (dynamic quantization) or 'onnx'
+ONNX_DIR = "onnx"  # Subdirectory for exported ONNX models
+
+# --- Startup Settings ---
+STARTUP_WORKERS = 4  # Threads running startup tasks in parallel
+MODEL_WORKER_START_TIMEOUT = 30  # Seconds the model worker has to connect
+IMPORT_TIME_BUDGET_MS = 150
+# Import time of the app allowed outside Kivy, checked by benchmark_imports.py
+LAZY_MODULES = ('torch', 'transformers', 'textblob', 'spellchecker', 'fpdf',
+                'docx', 'pyphen', 'requests', 'numpy')
+# Heavy dependencies that must only be imported on first use
+
+# --- Spell Check Settings ---
+USER_DICTIONARY_FILE = "user_words.txt"  # Words added by the user
+SYMSPELL_INDEX_FILE = "spell_index.bin"  # Saved spelling suggestion index
+
+# --- Text Analysis Cache Settings ---
+TOKEN_CACHE_LINES = 4096  # Lines whose tokens are kept by the tokenizer
+
+# --- Sentiment Settings ---
+SENTIMENT_CACHE_FILE = "sentiment_cache.sqlite3"  # Cache of sentiment scores
+SENTIMENT_CACHE_TTL = 365 * 24 * 60 * 60  # Seconds before a score expires
+SENTIMENT_CACHE_MAX_BYTES = 16 * 1024 * 1024  # Size cap of the score cache
+SENTIMENT_CHUNK_SIZE = 64  # Texts scored per task on the process pool
+SENTIMENT_WORKERS = None  # Scoring processes; None uses every core
+SENTIMENT_LINE_CACHE_SIZE = 4096  # Lines whose timeline score is kept
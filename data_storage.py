@@ -1,10 +1,13 @@
 """Data storage module for the Lyrics App."""
 from pathlib import Path
 import json
-from fpdf import FPDF
-from docx import Document
 import os
 
+from lazy_imports import lazy_import
+
+fpdf = lazy_import('fpdf')  # Imported on first PDF export
+docx = lazy_import('docx')  # Imported on first DOCX export
+
 # Define a base directory for storing data files
 BASE_DIR = Path.home()  # This will use the user's home directory
 APP_DIR = BASE_DIR / "RapWriter"  # Base directory for the app
@@ -66,7 +69,7 @@ def get_available_lyrics():
 def export_to_pdf(filename, lyrics):
     """Exports lyrics to a PDF file."""
     filepath = LYRICS_DIR / filename.replace('.txt', '.pdf')
-    pdf = FPDF()
+    pdf = fpdf.FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
 
@@ -83,7 +86,7 @@ def export_to_pdf(filename, lyrics):
 def export_to_docx(filename, lyrics):
     """Exports lyrics to a DOCX file."""
     filepath = LYRICS_DIR / filename.replace('.txt', '.docx')
-    doc = Document()
+    doc = docx.Document()
     doc.add_paragraph(lyrics)
     doc.save(filepath)
     print(f"Lyrics exported to DOCX at {filepath}")
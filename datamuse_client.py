@@ -0,0 +1,127 @@
+"""
+Module with the shared client used for every Datamuse API request.
+
+The client keeps one pooled keep-alive session and one bounded worker pool,
+applies a timeout to every request and a deadline to every batch, and
+reads through the persistent response cache.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from urllib.parse import urlencode
+
+import config
+from lazy_imports import lazy_import
+from response_cache import get_response_cache
+
+requests = lazy_import('requests')  # Imported when the client is built
+requests_adapters = lazy_import('requests.adapters')
+
+DATAMUSE_URL = "https://api.datamuse.com/words"
+
+
+def query_params(relation, word, max_results=None):
+    """Returns the Datamuse query parameters of a words request."""
+    params = {relation: word}
+    if max_results is not None:
+        params['max'] = max_results
+    return params
+
+
+class DatamuseClient:
+    """Pooled, bounded-concurrency client for the Datamuse API."""
+
+    def __init__(self, pool_size=config.DATAMUSE_POOL_SIZE,
+                 timeout=config.DATAMUSE_TIMEOUT,
+                 deadline=config.DATAMUSE_BATCH_DEADLINE):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.session = requests.Session()
+        adapter = requests_adapters.HTTPAdapter(pool_connections=1,
+                                                pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size,
+                                           thread_name_prefix='datamuse')
+
+    def get(self, url, params=None):
+        """Sends a GET request over the pooled session.
+
+        Returns the decoded JSON response, or None if the request failed.
+        """
+        try:
+            response = self.session.get(url, params=params,
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Request exception: {e}")
+            return None
+
+    def request_words(self, relation, word, max_results=None):
+        """Requests the words related to a word by the given relation."""
+        items = self.get(DATAMUSE_URL, query_params(relation, word,
+                                                    max_results))
+        return [item['word'] for item in items] if items else []
+
+    def words(self, relation, word, max_results=None):
+        """Returns the words related to a word, through the response cache.
+
+        Relations are Datamuse query parameters such as 'rel_rhy' or 'sl'.
+        Responses are cached under every query parameter, so a result
+        fetched with a small max is never served for a larger one.
+        """
+        word = word.lower()
+        return get_response_cache().get_or_fetch(
+            DATAMUSE_URL,
+            urlencode(sorted(query_params(relation, word,
+                                          max_results).items())),
+            lambda: self.request_words(relation, word, max_results)
+        )
+
+    async def fetch_batch(self, words, relations=('rel_rhy', 'sl'),
+                          max_results=None):
+        """Fetches every relation of every word in one parallel round.
+
+        Returns {word: {relation: [words]}}. Requests still running when
+        the batch deadline passes are reported as empty lists.
+        """
+        jobs = [(word, relation) for word in words for relation in relations]
+        if not jobs:
+            return {word: {} for word in words}
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(self.executor, self.words, relation, word,
+                                 max_results)
+            for word, relation in jobs
+        ]
+        done, pending = await asyncio.wait(futures, timeout=self.deadline)
+        for future in pending:
+            future.cancel()
+        if pending:
+            print(f"Datamuse batch deadline hit, {len(pending)} requests "
+                  f"dropped.")
+
+        results = {word: {} for word in words}
+        for (word, relation), future in zip(jobs, futures):
+            ok = future in done and future.exception() is None
+            results[word][relation] = future.result() if ok else []
+        return results
+
+    def fetch_batch_sync(self, words, relations=('rel_rhy', 'sl'),
+                         max_results=None):
+        """Runs fetch_batch() to completion from synchronous code."""
+        return asyncio.run(self.fetch_batch(words, relations, max_results))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the shared Datamuse client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DatamuseClient()
+        return _client
@@ -1,8 +1,6 @@
 """Event handlers for the Lyrics App."""
 
-from syllable_counter import count_syllables
 import data_storage
-from rhyme_generator import fetch_rhymes
 
 
 def get_rhyme_suggestions(app_instance):
@@ -10,24 +8,16 @@ def get_rhyme_suggestions(app_instance):
     words = app_instance.get_selected_word().split()
     print(f"Getting rhyme suggestions for: {words}")
     app_instance.show_loading_popup()
-    rhymes = fetch_rhymes(words)
-    print(f"Rhymes fetched: {rhymes}")  # Add this line
-    app_instance.display_rhymes(words, rhymes)
-    print("Rhyme display called")  # Add this line
+    # Fetched on the app's executor; the result is shown when it is ready
+    app_instance.process_rhymes(words)
 
 
 def update_counter(app_instance, text):
     """Updates the syllable count and bar count displayed in the app."""
-    lines = text.splitlines()
-    syllable_count = sum(count_syllables(line) for line in lines)
-    bar_count = len(lines)
+    counter = app_instance.bar_counter
+    bar_count, syllable_count, avg_syl_per_bar = counter.update(text)
 
-    avg_syl_per_bar = syllable_count / bar_count if bar_count > 0 else 0
-
-    app_instance.counter_label.text = (
-        f"Bars: {bar_count} | Syllables: {syllable_count} | "
-        f"AvgSyl: {avg_syl_per_bar:.2f}"
-    )
+    app_instance.ui['counter_label'].text = counter.format_label()
     print(
         f"Counter updated: Bars={bar_count}, Syllables={syllable_count}, "
         f"AvgSyl={avg_syl_per_bar:.2f}"
@@ -36,8 +26,10 @@ def update_counter(app_instance, text):
 
 def on_text_change(app_instance, value):
     """Handles text changes in the lyrics input."""
-    app_instance.undo_redo_manager.save_state(value)
+    # Typing is saved to the undo history by the debounced capture
+    app_instance.undo_capture.text_changed(value)
     update_counter(app_instance, value)
+    app_instance.update_undo_redo_buttons()
 
 
 def save_lyrics(app_instance):
@@ -0,0 +1,105 @@
+"""
+Module with the selectable CPU inference backends for GPT-2.
+
+Every backend returns a (model, tokenizer) pair whose model supports
+generate(), so ai_suggestions works the same with any of them:
+    torch  full precision PyTorch model
+    int8   PyTorch model with dynamically quantized int8 linear layers
+    onnx   ONNX Runtime model, exported once and kept in the app directory
+"""
+
+import os
+
+import config
+
+
+def load_tokenizer(model_name):
+    """Loads the GPT-2 tokenizer."""
+    from transformers import GPT2Tokenizer
+    return GPT2Tokenizer.from_pretrained(model_name)
+
+
+def load_torch(model_name):
+    """Loads the full precision PyTorch model."""
+    from transformers import GPT2LMHeadModel
+    model = GPT2LMHeadModel.from_pretrained(model_name)
+    model.eval()
+    return model, load_tokenizer(model_name)
+
+
+def conv1d_to_linear(module):
+    """Replaces GPT-2's Conv1D layers with equivalent nn.Linear layers.
+
+    Conv1D stores its weight transposed and is not recognized by dynamic
+    quantization, which only converts nn.Linear layers.
+    """
+    from torch import nn
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            conv1d_to_linear(child)
+
+
+def load_int8(model_name):
+    """Loads the model with int8 dynamically quantized linear layers.
+
+    The output projection (lm_head) stays in full precision, since it is
+    tied to the token embeddings and quantizing it costs the most quality.
+    """
+    import torch
+    from torch import nn
+
+    model, tokenizer = load_torch(model_name)
+    conv1d_to_linear(model.transformer)
+    qconfig_spec = {
+        name: torch.ao.quantization.default_dynamic_qconfig
+        for name, module in model.named_modules()
+        if isinstance(module, nn.Linear) and name != 'lm_head'
+    }
+    model = torch.ao.quantization.quantize_dynamic(model, qconfig_spec,
+                                                   dtype=torch.qint8)
+    model.eval()
+    return model, tokenizer
+
+
+def get_onnx_dir(model_name):
+    """Returns the directory of the exported ONNX model."""
+    return os.path.join(os.path.expanduser("~"), config.BASE_DIR,
+                        config.ONNX_DIR, model_name)
+
+
+def load_onnx(model_name):
+    """Loads the ONNX Runtime model, exporting it on first use."""
+    from optimum.onnxruntime import ORTModelForCausalLM
+
+    onnx_dir = get_onnx_dir(model_name)
+    if os.path.isdir(onnx_dir):
+        model = ORTModelForCausalLM.from_pretrained(onnx_dir, use_cache=True)
+    else:
+        print(f"Exporting '{model_name}' to ONNX in {onnx_dir}...")
+        model = ORTModelForCausalLM.from_pretrained(model_name, export=True,
+                                                    use_cache=True)
+        model.save_pretrained(onnx_dir)
+    return model, load_tokenizer(model_name)
+
+
+BACKENDS = {
+    'torch': load_torch,
+    'int8': load_int8,
+    'onnx': load_onnx
+}
+
+
+def load_backend(name, model_name):
+    """Loads the model and tokenizer with the named backend."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}'. "
+                         f"Choose one of: {', '.join(BACKENDS)}.")
+    return BACKENDS[name](model_name)
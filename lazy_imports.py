@@ -0,0 +1,72 @@
+"""
+Module for importing heavy dependencies on first use.
+
+lazy_import() returns a stand-in for a module that imports the real
+module the first time one of its attributes is used, so a dependency only
+costs import time in sessions that use its feature:
+
+    fpdf = lazy_import('fpdf')
+    ...
+    pdf = fpdf.FPDF()  # fpdf is imported here
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+_lazy_modules = {}
+_lazy_modules_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        # Set through __dict__, since __getattr__ is only for the real module
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self):
+        """Imports the real module, once, and returns it."""
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    @property
+    def is_loaded(self):
+        """Returns True once the real module has been imported."""
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """Returns the module if already imported, else a shared LazyModule."""
+    if name in sys.modules:
+        return sys.modules[name]
+    with _lazy_modules_lock:
+        if name not in _lazy_modules:
+            _lazy_modules[name] = LazyModule(name)
+        return _lazy_modules[name]
+
+
+def loaded_modules():
+    """Returns the names of the lazy modules that have been imported."""
+    with _lazy_modules_lock:
+        return sorted(name for name, module in _lazy_modules.items()
+                      if module.is_loaded)
@@ -27,6 +27,7 @@ import random
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
+from kivy.uix.progressbar import ProgressBar
 from kivy.uix.screenmanager import Screen, ScreenManager
 from kivy.uix.widget import Widget
 from kivy.graphics import Color, PushMatrix, PopMatrix, Rotate, Line
@@ -131,6 +132,7 @@ Args:
 Methods:
     animate_loading_text: Animates the loading text by cycling
     through different dot patterns.
+    set_progress: Shows the progress of the startup tasks.
 """
 
     def __init__(self, **kwargs):
@@ -167,6 +169,19 @@ Methods:
         )
         self.loading_label_container.add_widget(self.dots_label)
 
+        # Add progress bar and the name of the task being loaded
+        self.progress_bar = ProgressBar(max=1, value=0, size_hint=(1, None),
+                                        height=20)
+        self.layout.add_widget(self.progress_bar)
+        self.status_label = Label(
+            text="",
+            font_size="16sp",
+            color=[0, 0, 0, 1],  # Black text color
+            size_hint=(1, None),
+            height=30,
+        )
+        self.layout.add_widget(self.status_label)
+
         # Add the Image logo to the center of the screen
         self.logo_image = Image(
             source="C:/Users/eroge/Desktop/Rap_Writer/Logo/Logo.PNG",
@@ -208,6 +223,11 @@ Returns:
     None
 """
 
+    def set_progress(self, fraction, message=""):
+        """Shows the fraction of startup work done and what is loading."""
+        self.progress_bar.value = fraction
+        self.status_label.text = message
+
 
 class RotatingLabel(Label, EventDispatcher):
     """
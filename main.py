@@ -2,10 +2,8 @@
 
 
 from concurrent.futures import ThreadPoolExecutor
-import time
 import traceback
 import os   
-from spellchecker import SpellChecker
 from loading import LoadingScreen
 from kivy.app import App
 from kivy.core.window import Window
@@ -24,14 +22,25 @@ from kivy.animation import Animation
 from kivy.uix.widget import Widget
 from kivy.graphics import Color, Ellipse, Line
 import math
-import ai_suggestions
+import config
 import ui_builder
 import undo_redo
 import data_storage
 import help_module
+from bar_counter import BarCounter
+from lazy_imports import lazy_import
+from model_worker import ModelWorker
+from pronunciation_dict import get_dictionary
+from response_cache import get_response_cache
+from spell_dictionary import SLANG_WORDS, UserDictionary, get_symspell_index
+from spell_index import SpellIndex, apply_correction, shift
+from startup import StartupPipeline
+from syllable_counter import estimate_syllables, get_hyphenator
 from rhyme_generator import fetch_rhymes
 from ui_builder import create_menu_popup
-from event_handlers import update_counter, get_rhyme_suggestions
+from event_handlers import get_rhyme_suggestions
+
+spellchecker = lazy_import('spellchecker')  # Imported by the startup pipeline
 
 
 class SpinningWheel(Widget):
@@ -61,34 +70,45 @@ class LyricsApp(App):
         super().__init__(**kwargs)
         print("LyricsApp initialized")
         self.undo_redo_manager = undo_redo.UndoRedoManager()
+        self.undo_capture = undo_redo.DebouncedCapture(
+            self.undo_redo_manager, Clock.schedule_once,
+            on_capture=self.update_undo_redo_buttons)
         self.ui = {
             'lyrics_input': None,
             'counter_label': Label(text="Bars: 0 | Syllables: 0 | AvgSyl: 0.00"),
             'popup': None,
             'sm': ScreenManager(transition=FadeTransition(duration=1)),
             'layout': None,
-            'loading_spinner': None
+            'loading_spinner': None,
+            'loading_screen': None
         }
         self.settings = {
             'selected_style': "general",
             'max_lines': 10,
             'temperature': 0.8,
-            'top_p': 0.95
+            'top_p': 0.95,
+            'candidates': config.AI_CANDIDATES
         }
+        self.ai_candidates = {'prompt': None, 'lyrics': None, 'items': [],
+                              'index': 0, 'loading': False}
         self.executor = ThreadPoolExecutor(max_workers=2)
-        self.spell = SpellChecker()  # Initialize SpellChecker
-        self.current_word_index = 0
-        self.words = []
+        self.model_worker = ModelWorker()
+        self.spell = None  # Created by the startup pipeline
+        self.startup = StartupPipeline()
+        self.spell_index = None  # Created by the startup pipeline
+        self.spell_check = {'misspellings': [], 'index': 0}
+        self.bar_counter = BarCounter(self.count_syllables)
 
     # Constants
     LOADING_SCREEN_DELAY = 0.1  # Slight delay to ensure UI update
-    HEAVY_TASK_DELAY = 6  # Simulated delay for heavy tasks
+    RHYMES_PER_FRAME = 10  # Multi-word rhymes added to the popup per frame
 
     def build(self):
         print("Building app")
         main_screen = Screen(name="main")
         loading_screen = LoadingScreen()
         main_screen.add_widget(loading_screen)
+        self.ui['loading_screen'] = loading_screen
         self.ui['sm'].add_widget(main_screen)
         self.ui['sm'].current = "main"
         print("Loading screen added")
@@ -99,14 +119,52 @@ class LyricsApp(App):
         return self.ui['sm']
 
     def start_loading_tasks(self, dt):
+        """Starts the startup tasks; the editor opens once it can be used.
+
+        The pronunciation dictionary and Pyphen are needed to count
+        syllables while typing. The spell checker, response cache and AI
+        model keep loading in the background after the editor opens.
+        """
         print("Starting loading tasks")
-        self.executor.submit(self.load_heavy_tasks)
+        self.startup.add('pronunciations', get_dictionary,
+                         description="pronunciation dictionary")
+        self.startup.add('hyphenator', get_hyphenator,
+                         description="syllable rules")
+        self.startup.add('spellchecker', self.load_spell_checker,
+                         required=False, description="spell checker")
+        self.startup.add('spell_suggestions', self.load_spell_suggestions,
+                         depends=('spellchecker',), required=False,
+                         description="spelling suggestions")
+        self.startup.add('response_cache', get_response_cache,
+                         required=False, description="rhyme cache")
+        self.startup.add('ai_model', self.load_ai_model, required=False,
+                         description="AI model")
+        self.startup.run(
+            on_progress=lambda fraction, message: Clock.schedule_once(
+                lambda dt: self.update_loading_progress(fraction, message)),
+            on_ready=lambda: Clock.schedule_once(self.complete_loading, 0)
+        )
+
+    def load_spell_checker(self):
+        """Builds the spell checker, which loads its word frequency list."""
+        self.spell = spellchecker.SpellChecker()
+        self.spell_index = SpellIndex(self.spell, UserDictionary())
 
-    def load_heavy_tasks(self):
-        print("Loading heavy tasks")
-        time.sleep(self.HEAVY_TASK_DELAY)
-        print("Heavy tasks completed")
-        Clock.schedule_once(self.complete_loading, 0)
+    def load_spell_suggestions(self):
+        """Loads or builds the index used to suggest spelling corrections."""
+        self.spell_index.set_symspell(get_symspell_index(
+            self.spell.word_frequency.dictionary, SLANG_WORDS))
+
+    def load_ai_model(self):
+        """Starts the model worker and waits until it has loaded the model."""
+        self.model_worker.start()
+        if not self.model_worker.wait_until_ready():
+            raise RuntimeError(self.model_worker.status().get('error'))
+
+    def update_loading_progress(self, fraction, message):
+        """Shows startup progress while the loading screen is visible."""
+        if self.ui['layout'] is None and self.ui['loading_screen'] is not None:
+            self.ui['loading_screen'].set_progress(fraction, message)
 
     def complete_loading(self, dt):
         print("Completing loading")
@@ -119,9 +177,20 @@ class LyricsApp(App):
         main_screen = self.ui['sm'].get_screen("main")
         main_screen.clear_widgets()
         main_screen.add_widget(self.ui['layout'])
+        self.ui['loading_screen'] = None
+        print(self.startup.report())
+
+    def on_stop(self):
+        """Stops the model worker process when the app closes."""
+        self.model_worker.stop()
+
+    def show_ai_suggestion(self, suggestion, request=None):
+        """Shows the AI suggestion.
 
-    def show_ai_suggestion(self, suggestion):
-        """Shows the AI suggestion."""
+        The text can be extended later with update_ai_suggestion(); closing
+        the popup cancels the model worker requests still generating it or
+        its alternatives.
+        """
         print(f"Showing AI suggestion: {suggestion}")
         content = BoxLayout(orientation="vertical", padding=10, spacing=10)
         scroll_view = ScrollView(size_hint=(1, None), size=(400, 200))
@@ -135,6 +204,15 @@ class LyricsApp(App):
         suggestion_text.bind(minimum_height=suggestion_text.setter('height'))
         scroll_view.add_widget(suggestion_text)
         content.add_widget(scroll_view)
+        self.ui['ai_suggestion_text'] = suggestion_text
+
+        next_button = Button(
+            text="Next",
+            size_hint=(1, None),
+            height=50,
+            on_press=lambda x: self.show_next_ai_candidate()
+        )
+        content.add_widget(next_button)
 
         close_button = Button(
             text="Close",
@@ -149,9 +227,63 @@ class LyricsApp(App):
             content=content,
             size_hint=(0.8, 0.8)
         )
+        def on_dismiss(*args):
+            if request is not None:
+                request.cancel()
+            self.model_worker.cancel_channel('candidates')
+
+        self.ui['popup'].bind(on_dismiss=on_dismiss)
         self.ui['popup'].open()
         print("AI suggestion popup opened.")
 
+    def update_ai_suggestion(self, suggestion):
+        """Replaces the text of the open AI suggestion popup."""
+        if self.ui.get('ai_suggestion_text') is not None:
+            self.ui['ai_suggestion_text'].text = suggestion
+
+    def show_next_ai_candidate(self):
+        """Shows the next alternative suggestion.
+
+        The first time, all alternatives are generated in one batched model
+        call; after that they are cycled through without calling the model.
+        Alternatives that arrive after their popup was closed or replaced by
+        a new suggestion are dropped.
+        """
+        candidates = self.ai_candidates
+        popup = self.ui['popup']
+        if candidates['items']:
+            candidates['index'] = (candidates['index'] + 1) % len(candidates['items'])
+            self.update_ai_suggestion(candidates['items'][candidates['index']])
+            return
+        if candidates['loading'] or candidates['prompt'] is None:
+            return
+
+        candidates['loading'] = True
+        self.update_ai_suggestion("Generating alternatives...")
+
+        def show_candidates(items):
+            """Stores the alternatives; runs on the UI thread."""
+            if self.ai_candidates is not candidates or self.ui['popup'] is not popup:
+                print("Dropping alternatives of a closed AI suggestion.")
+                return
+            candidates['items'] = items
+            candidates['loading'] = False
+            self.update_ai_suggestion(
+                items[0] if items else "No alternatives generated. Please try again.")
+
+        def on_done(items):
+            Clock.schedule_once(lambda dt: show_candidates(items))
+
+        def on_error(error):
+            print(f"Error generating AI candidates: {error}")
+            on_done([])
+
+        self.model_worker.candidates(
+            candidates['prompt'], candidates['lyrics'],
+            self.settings['max_lines'], self.settings['candidates'],
+            channel='candidates', on_done=on_done, on_error=on_error
+        )
+
     def accept_suggestion(self, suggestion):
         """Accepts the AI suggestion."""
         self.ui['lyrics_input'].text += "\n" + suggestion
@@ -204,12 +336,25 @@ class LyricsApp(App):
         Clock.schedule_once(lambda dt: self.process_rhymes(words))
 
     def process_rhymes(self, words):
-        rhymes = fetch_rhymes(words)
-        print(f"Rhymes fetched: {rhymes}")  # Add this line for debugging
-        Clock.schedule_once(lambda dt: self.display_rhymes(words, rhymes))
+        """Fetches the rhymes in the background, then shows them.
+
+        The network and dictionary lookups all happen on the executor;
+        the UI thread only combines the fetched multi-word rhymes.
+        """
+        def fetch():
+            try:
+                rhymes = fetch_rhymes(words, stream=True)
+            except Exception as error:
+                print(f"Error fetching rhymes: {error}")
+                traceback.print_exc()
+                rhymes = iter(()) if len(words) > 1 else []
+            print(f"Rhymes fetched for {words}")
+            Clock.schedule_once(lambda dt: self.display_rhymes(words, rhymes))
+
+        self.executor.submit(fetch)
 
     def display_rhymes(self, words, rhymes):
-        print(f"Displaying rhymes for {words}: {rhymes}")  # Add this line
+        print(f"Displaying rhymes for {words}")
         self.dismiss_loading_popup()
         if len(words) > 1:
             self.show_multi_word_rhyme_suggestions(rhymes)
@@ -218,20 +363,21 @@ class LyricsApp(App):
         print("Rhyme display completed")  # Add this line
 
     def show_multi_word_rhyme_suggestions(self, all_rhymes):
-        print(f"Showing multi-word rhyme suggestions: {all_rhymes}")
+        """Shows multi-word rhymes, adding them to the popup as they arrive.
+
+        all_rhymes is either a {word_count: rhymes} dict or an iterator of
+        (word_count, phrase) pairs such as fetch_rhymes(words, stream=True).
+        """
+        print("Showing multi-word rhyme suggestions")
+        if isinstance(all_rhymes, dict):
+            all_rhymes = ((word_count, rhyme) for word_count, rhymes
+                          in sorted(all_rhymes.items(), reverse=True)
+                          for rhyme in rhymes[:20])  # Limit to 20 rhymes per word count
         content = BoxLayout(orientation='vertical', padding=10, spacing=10)
         scroll_view = ScrollView(size_hint=(1, None), size=(400, 300))
         inner_layout = BoxLayout(orientation='vertical', size_hint_y=None)
         inner_layout.bind(minimum_height=inner_layout.setter('height'))
 
-        for word_count, rhymes in sorted(all_rhymes.items(), reverse=True):
-            inner_layout.add_widget(Label(text=f"{word_count}-word rhymes:",
-                                          size_hint_y=None, height=30))
-            for rhyme in rhymes[:20]:  # Limit to 20 rhymes per word count
-                rhyme_label = Label(text=rhyme, size_hint_y=None, height=40)
-                inner_layout.add_widget(rhyme_label)
-            inner_layout.add_widget(Label(text="", size_hint_y=None, height=20))  # Spacer
-
         scroll_view.add_widget(inner_layout)
         content.add_widget(scroll_view)
 
@@ -241,6 +387,32 @@ class LyricsApp(App):
 
         self.create_and_show_popup('Multi-Word Rhyme Suggestions', content)
 
+        popup = self.ui['popup']
+        rhyme_stream = iter(all_rhymes)
+        current_word_count = None
+
+        def add_rhymes(dt):
+            """Adds the next batch of rhymes; stops when the stream ends."""
+            nonlocal current_word_count
+            for _ in range(self.RHYMES_PER_FRAME):
+                try:
+                    word_count, rhyme = next(rhyme_stream)
+                except StopIteration:
+                    return False
+                if word_count != current_word_count:
+                    if current_word_count is not None:
+                        inner_layout.add_widget(Label(text="", size_hint_y=None, height=20))  # Spacer
+                    inner_layout.add_widget(Label(text=f"{word_count}-word rhymes:",
+                                                  size_hint_y=None, height=30))
+                    current_word_count = word_count
+                inner_layout.add_widget(Label(text=rhyme, size_hint_y=None, height=40))
+            return True
+
+        if add_rhymes(0):
+            event = Clock.schedule_interval(add_rhymes, 0)
+            # Stop adding rhymes however the popup is closed
+            popup.bind(on_dismiss=lambda *args: event.cancel())
+
     def show_single_word_rhyme_suggestions(self, word, rhymes):
         print(f"Showing single-word rhyme suggestions for '{word}': {rhymes}")
         content = BoxLayout(orientation='vertical', padding=10, spacing=10)
@@ -358,26 +530,26 @@ class LyricsApp(App):
 
     def on_text_change(self, instance, value):
         """Handles text changes in the lyrics input."""
-        Clock.schedule_once(lambda dt: self.delayed_save_state(value), 0.5)
+        self.undo_capture.text_changed(value)
         self.update_counter(value)
         self.update_undo_redo_buttons()
 
-    def delayed_save_state(self, value):
-        """Saves the state after a short delay to avoid saving every keystroke."""
-        self.undo_redo_manager.save_state(value)
-
     def undo_action(self, instance):
         """Undoes the action."""
+        self.undo_capture.flush()  # Typing not saved yet is undone first
         previous_state = self.undo_redo_manager.undo()
         if previous_state is not None:
             self.ui['lyrics_input'].text = previous_state
+            self.undo_capture.sync(previous_state)
         self.update_undo_redo_buttons()
 
     def redo_action(self, instance):
         """Redoes the action."""
+        self.undo_capture.flush()
         next_state = self.undo_redo_manager.redo()
         if next_state is not None:
             self.ui['lyrics_input'].text = next_state
+            self.undo_capture.sync(next_state)
         self.update_undo_redo_buttons()
 
     def update_undo_redo_buttons(self):
@@ -429,34 +601,44 @@ class LyricsApp(App):
             print("No lyrics provided for AI suggestion.")
             return
 
-        def fetch_suggestion():
-            """Fetches the AI suggestion."""
-            try:
-                print("Fetching AI suggestion...")
-                print(f"Current lyrics: {current_lyrics}")
-                print(f"Prompt: {prompt}")
-                print(f"Max lines: {self.settings['max_lines']}")
-                
-                suggestion = ai_suggestions.generate_rap_lyrics(
-                    prompt=prompt,
-                    current_lyrics=current_lyrics,
-                    max_lines=self.settings['max_lines']
-                )
-                print(f"AI suggestion received: {suggestion}")
-                
-                if suggestion and suggestion.strip():
-                    Clock.schedule_once(lambda dt: self.show_ai_suggestion(suggestion))
-                else:
-                    print("Error: AI suggestion is empty or None")
-                    Clock.schedule_once(lambda dt: self.show_error_message("Failed to generate AI suggestion. Please try again."))
-            except Exception as error:
-                print(f"Error generating AI suggestion: {error}")
-                traceback.print_exc()
-                Clock.schedule_once(lambda dt: self.show_error_message(f"An error occurred: {str(error)}"))
+        self.ai_candidates = {'prompt': prompt, 'lyrics': current_lyrics,
+                              'items': [], 'index': 0, 'loading': False}
+
+        lines = []
+
+        def on_line(line):
+            """Shows each line of the suggestion as it arrives."""
+            lines.append(line)
+            suggestion = '\n'.join(lines)
+            Clock.schedule_once(lambda dt: self.update_ai_suggestion(suggestion))
+
+        def on_done(result):
+            print(f"AI suggestion received: {result}")
+            if not result:
+                print("Error: AI suggestion is empty or None")
+                Clock.schedule_once(lambda dt: self.close_popup())
+                Clock.schedule_once(lambda dt: self.show_error_message("Failed to generate AI suggestion. Please try again."))
+
+        def on_error(error):
+            print(f"Error generating AI suggestion: {error}")
+            Clock.schedule_once(lambda dt: self.close_popup())
+            Clock.schedule_once(lambda dt: self.show_error_message(f"An error occurred: {error}"))
+
+        print("Fetching AI suggestion...")
+        print(f"Current lyrics: {current_lyrics}")
+        print(f"Prompt: {prompt}")
+        print(f"Max lines: {self.settings['max_lines']}")
 
-        self.executor.submit(fetch_suggestion)
         if self.ui['popup']:
             self.ui['popup'].dismiss()  # Close the popup after generating
+        self.model_worker.cancel_channel('candidates')
+        # A new suggestion supersedes, and cancels, the previous one
+        request = self.model_worker.stream(
+            prompt, current_lyrics, self.settings['max_lines'],
+            channel='suggestion', on_line=on_line, on_done=on_done,
+            on_error=on_error
+        )
+        self.show_ai_suggestion("", request=request)
         print("AI suggestion generation initiated.")
 
     def show_error_message(self, message):
@@ -502,19 +684,78 @@ class LyricsApp(App):
             self.show_help()
 
     def start_spell_check(self, instance):
-        self.words = self.ui['lyrics_input'].text.split()
-        self.current_word_index = 0
+        """Spell checks the whole text in the background, in one pass."""
+        if self.spell_index is None:
+            error = self.startup.error('spellchecker')
+            if error is not None:
+                self.show_spell_checker_error(error)
+            else:
+                self.show_error_message("The spell checker is still loading. Please try again in a moment.")
+            return
+        text = self.ui['lyrics_input'].text
+
+        def check():
+            try:
+                misspellings = self.spell_index.check(text)
+            except Exception as error:
+                print(f"Error during spell check: {error}")
+                traceback.print_exc()
+                Clock.schedule_once(lambda dt: self.show_error_message(f"An error occurred: {error}"))
+                return
+            print(f"Spell check found {len(misspellings)} possible misspellings")
+            Clock.schedule_once(lambda dt: self.begin_spell_check_review(text, misspellings))
+
+        self.executor.submit(check)
+
+    def show_spell_checker_error(self, error):
+        """Reports that the spell checker failed to load and offers a retry."""
+        content = BoxLayout(orientation='vertical')
+        content.add_widget(Label(text=f"The spell checker failed to load:\n{error}"))
+        buttons = BoxLayout(size_hint=(1, None), height=40)
+        retry_button = Button(text="Retry")
+        close_button = Button(text="Close")
+        buttons.add_widget(retry_button)
+        buttons.add_widget(close_button)
+        content.add_widget(buttons)
+        popup = Popup(title='Spell Check', content=content, size_hint=(0.8, 0.4))
+        retry_button.bind(on_press=lambda x: (popup.dismiss(), self.retry_spell_checker()))
+        close_button.bind(on_press=popup.dismiss)
+        popup.open()
+
+    def retry_spell_checker(self):
+        """Loads the spell checker again in the background, then checks."""
+        def load():
+            try:
+                self.startup.retry('spellchecker')
+            except Exception as error:
+                traceback.print_exc()
+                Clock.schedule_once(lambda dt: self.show_spell_checker_error(error))
+                return
+            Clock.schedule_once(lambda dt: self.start_spell_check(None))
+            try:
+                self.startup.retry('spell_suggestions')
+            except Exception as error:
+                # Suggestions then come from the spell checker itself
+                print(f"Spelling suggestions index unavailable: {error}")
+
+        self.executor.submit(load)
+
+    def begin_spell_check_review(self, text, misspellings):
+        """Walks the user through the misspellings found in the text."""
+        if self.ui['lyrics_input'].text != text:
+            # The text changed while it was being checked
+            self.start_spell_check(None)
+            return
+        self.spell_check = {'misspellings': misspellings, 'index': 0}
         self.check_next_word()
 
     def check_next_word(self):
-        if self.current_word_index < len(self.words):
-            word = self.words[self.current_word_index]
-            if word.lower() not in self.spell:
-                suggestions = self.spell.candidates(word)
-                self.show_spell_check_popup(word, suggestions)
-            else:
-                self.current_word_index += 1
-                self.check_next_word()
+        """Shows the next misspelling, or the end of the spell check."""
+        misspellings = self.spell_check['misspellings']
+        index = self.spell_check['index']
+        if index < len(misspellings):
+            misspelling = misspellings[index]
+            self.show_spell_check_popup(misspelling.word, misspelling.candidates)
         else:
             self.show_spell_check_complete()
 
@@ -530,6 +771,10 @@ class LyricsApp(App):
         else:
             content.add_widget(Label(text="No suggestions available"))
 
+        add_button = Button(text="Add to Dictionary", size_hint_y=None, height=40)
+        add_button.bind(on_release=lambda x: self.add_word_to_dictionary(word))
+        content.add_widget(add_button)
+
         skip_button = Button(text="Skip", size_hint_y=None, height=40)
         skip_button.bind(on_release=self.skip_word)
         content.add_widget(skip_button)
@@ -540,15 +785,38 @@ class LyricsApp(App):
         self.ui['spell_check_popup'].open()
 
     def apply_suggestion(self, suggestion):
-        self.words[self.current_word_index] = suggestion
-        self.ui['lyrics_input'].text = ' '.join(self.words)
+        """Replaces only the misspelled span, keeping the rest of the text."""
+        self.ui['spell_check_popup'].dismiss()
+        misspellings = self.spell_check['misspellings']
+        index = self.spell_check['index']
+        misspelling = misspellings[index]
+        try:
+            text, delta = apply_correction(self.ui['lyrics_input'].text,
+                                           misspelling, suggestion)
+        except ValueError as error:
+            print(f"Cannot apply spell check suggestion: {error}")
+        else:
+            self.ui['lyrics_input'].text = text
+            self.spell_check['misspellings'] = shift(misspellings,
+                                                     misspelling.end, delta)
+        self.spell_check['index'] += 1
+        self.check_next_word()
+
+    def add_word_to_dictionary(self, word):
+        """Accepts the word from now on and skips its other occurrences."""
         self.ui['spell_check_popup'].dismiss()
-        self.current_word_index += 1
+        self.spell_index.accept(word)
+        index = self.spell_check['index']
+        misspellings = self.spell_check['misspellings']
+        self.spell_check['misspellings'] = misspellings[:index + 1] + [
+            m for m in misspellings[index + 1:]
+            if m.word.lower() != word.lower()]
+        self.spell_check['index'] += 1
         self.check_next_word()
 
     def skip_word(self, instance):
         self.ui['spell_check_popup'].dismiss()
-        self.current_word_index += 1
+        self.spell_check['index'] += 1
         self.check_next_word()
 
     def show_spell_check_complete(self):
@@ -564,30 +832,13 @@ class LyricsApp(App):
         self.ui['spell_check_complete_popup'].open()
 
     def update_counter(self, text):
-        """Updates the counter label."""
-        bars = text.count('\n') + 1
-        words = text.split()
-        syllables = sum(self.count_syllables(word) for word in words)
-        avg_syllables = syllables / bars if bars > 0 else 0
-        self.ui['counter_label'].text = f"Bars: {bars} | Syllables: {syllables} | AvgSyl: {avg_syllables:.2f}"
+        """Updates the counter label, recounting only the edited lines."""
+        self.bar_counter.update(text)
+        self.ui['counter_label'].text = self.bar_counter.format_label()
 
     def count_syllables(self, word):
         """Counts syllables in a word. This is a simple implementation and may not be 100% accurate."""
-        word = word.lower()
-        count = 0
-        vowels = 'aeiouy'
-        if word[0] in vowels:
-            count += 1
-        for index in range(1, len(word)):
-            if word[index] in vowels and word[index - 1] not in vowels:
-                count += 1
-        if word.endswith('e'):
-            count -= 1
-        if word.endswith('le'):
-            count += 1
-        if count == 0:
-            count += 1
-        return count
+        return estimate_syllables(word)
 
     def show_menu_popup(self, instance):
         popup = create_menu_popup(self)
@@ -0,0 +1,424 @@
+"""
+Module for running AI suggestions in a separate worker process.
+
+The worker process owns the model, so inference never competes with the
+Kivy main thread for the GIL. The app talks to it over a pipe: requests go
+in, and lines, results and errors come back to callbacks, which run on a
+listener thread in the app process.
+
+Requests on the same channel supersede each other: submitting a new one
+cancels the previous one. A request identical to one still in flight is
+coalesced with it instead of being generated twice.
+
+The worker is started as `python -m model_worker`, not with a
+multiprocessing spawn, which would re-import the app's main module, and
+with it Kivy and a second window, in the worker process. Starting it never
+blocks: the listener thread waits for the worker to connect, and requests
+submitted meanwhile are sent once it has. If the worker exits or does not
+connect in time, every pending request fails through its on_error.
+"""
+
+import itertools
+from multiprocessing.connection import AuthenticationError, Client, Listener
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+import config
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class WorkerRequest:
+    """Handle for a request sent to the model worker."""
+
+    def __init__(self, worker, request_id, key):
+        self.worker = worker
+        self.request_id = request_id
+        self.key = key
+        self.line_callbacks = []
+        self.done_callbacks = []
+        self.error_callbacks = []
+        self.lines = []
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.finished = threading.Event()
+
+    def add_callbacks(self, on_line=None, on_done=None, on_error=None):
+        """Registers callbacks; lines received so far are replayed."""
+        if on_line:
+            self.line_callbacks.append(on_line)
+            for line in list(self.lines):
+                on_line(line)
+        if on_done:
+            self.done_callbacks.append(on_done)
+        if on_error:
+            self.error_callbacks.append(on_error)
+
+    def cancel(self):
+        """Cancels the request; no more callbacks are called for it."""
+        if not self.finished.is_set():
+            self.cancelled = True
+            self.worker.cancel(self)
+
+    def wait(self, timeout=None):
+        """Waits for the request to finish and returns its result."""
+        self.finished.wait(timeout)
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        return self.result
+
+
+class ModelWorker:
+    """Starts the worker process and dispatches its replies."""
+
+    def __init__(self):
+        self.process = None
+        self.connection = None
+        self.outbox = []  # Messages waiting for the worker to connect
+        self.listener = None
+        self.requests = {}
+        self.channels = {}
+        self.ids = itertools.count(1)
+        self.last_status = {'state': 'idle', 'ready': False}
+        self.loaded = threading.Event()
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Starts the worker process, which warms up the model right away.
+
+        Returns without waiting for the worker to connect; returns False if
+        the process could not be started at all.
+        """
+        with self.lock:
+            if self.process is not None:
+                return True
+            self.connection = None
+            self.outbox = []
+            self.loaded.clear()
+            self.last_status = {'state': 'starting', 'ready': False}
+            authkey = os.urandom(32)
+            server = None
+            try:
+                if getattr(sys, 'frozen', False):
+                    raise OSError("a frozen build cannot run "
+                                  "`python -m model_worker`")
+                server = Listener(authkey=authkey)
+                self.process = subprocess.Popen(
+                    [sys.executable, '-m', 'model_worker', server.address],
+                    cwd=WORKER_DIR, stdin=subprocess.PIPE)
+                # The key goes through stdin, so it never shows in ps
+                self.process.stdin.write(authkey.hex().encode('ascii') + b'\n')
+                self.process.stdin.close()
+            except OSError as e:
+                if server is not None:
+                    server.close()
+                if self.process is not None:
+                    self.process.kill()
+                    self.process = None
+                error = f"Could not start the model worker: {e}"
+            else:
+                self.listener = threading.Thread(
+                    target=self._listen, args=(server, authkey, self.process),
+                    name='model-worker-listener', daemon=True)
+                self.listener.start()
+                return True
+        print(error)
+        self._fail_start(error)
+        return False
+
+    def stop(self):
+        """Stops the worker process."""
+        with self.lock:
+            process = self.process
+            if process is None:
+                return
+            self.process = None
+            connected = self.connection is not None
+            if connected:
+                self._send(('stop',))
+        if connected:
+            try:
+                process.wait(timeout=5)
+                return
+            except subprocess.TimeoutExpired:
+                pass
+        process.terminate()
+
+    def status(self):
+        """Returns the last reported status of the model in the worker."""
+        return dict(self.last_status)
+
+    def wait_until_ready(self, timeout=None):
+        """Blocks until the worker has loaded the model; True if ready."""
+        self.loaded.wait(timeout)
+        return bool(self.last_status.get('ready'))
+
+    def stream(self, prompt, current_lyrics=None, max_lines=10,
+               channel=None, **callbacks):
+        """Streams suggestion lines to on_line, then calls on_done(lines)."""
+        return self._submit('stream', (prompt, current_lyrics, max_lines),
+                            channel, callbacks)
+
+    def candidates(self, prompt, current_lyrics=None, max_lines=10,
+                   num_candidates=4, channel=None, **callbacks):
+        """Generates ranked alternative suggestions, passed to on_done."""
+        return self._submit(
+            'candidates', (prompt, current_lyrics, max_lines, num_candidates),
+            channel, callbacks)
+
+    def _submit(self, kind, args, channel, callbacks):
+        if not self.start():
+            request = WorkerRequest(self, next(self.ids), (kind, args))
+            request.add_callbacks(**callbacks)
+            error = self.last_status.get('error')
+            self._dispatch(request, 'error', error,
+                           self._record(request, 'error', error))
+            return request
+        key = (kind, args)
+        with self.lock:
+            previous = self.channels.get(channel) if channel else None
+            # Coalesce with an identical request that is still running
+            request = next((r for r in self.requests.values()
+                            if r.key == key and not r.cancelled), None)
+            # Callbacks are attached before any reply can be dispatched
+            if request is None:
+                request = WorkerRequest(self, next(self.ids), key)
+                request.add_callbacks(**callbacks)
+                self.requests[request.request_id] = request
+                self._send(('submit', request.request_id, kind, args))
+            else:
+                request.add_callbacks(**callbacks)
+            if channel is not None:
+                self.channels[channel] = request
+
+        if (previous is not None and previous is not request
+                and not previous.finished.is_set()):
+            print(f"Cancelling superseded request {previous.request_id}")
+            previous.cancel()
+        return request
+
+    def cancel_channel(self, channel):
+        """Cancels the request last submitted on a channel, if any."""
+        with self.lock:
+            request = self.channels.pop(channel, None)
+        if request is not None:
+            request.cancel()
+
+    def cancel(self, request):
+        """Tells the worker to stop working on a request."""
+        with self.lock:
+            if self.requests.pop(request.request_id, None) is None:
+                return
+            self._send(('cancel', request.request_id))
+        request.finished.set()
+
+    def _send(self, message):
+        """Sends a message, or queues it until the worker connects.
+
+        Called with the lock held. A broken connection is left to the
+        listener, which fails every pending request.
+        """
+        if self.connection is None:
+            self.outbox.append(message)
+            return
+        try:
+            self.connection.send(message)
+        except (OSError, EOFError):
+            pass
+
+    def _accept(self, server, authkey, process):
+        """Waits for the worker to connect; returns None if it never does.
+
+        accept() cannot time out, so a watchdog wakes it by connecting
+        itself once the worker has exited or config.MODEL_WORKER_START_TIMEOUT
+        has passed.
+        """
+        accepted = threading.Event()
+        gave_up = threading.Event()
+
+        def watch():
+            deadline = time.monotonic() + config.MODEL_WORKER_START_TIMEOUT
+            while not accepted.wait(0.1):
+                if process.poll() is not None or time.monotonic() > deadline:
+                    gave_up.set()
+                    try:
+                        Client(server.address, authkey=authkey).close()
+                    except (OSError, EOFError, AuthenticationError):
+                        pass
+                    return
+
+        threading.Thread(target=watch, name='model-worker-watchdog',
+                         daemon=True).start()
+        with server:
+            try:
+                connection = server.accept()
+            except (OSError, EOFError, AuthenticationError) as e:
+                print(f"Model worker handshake failed: {e}")
+                connection = None
+            accepted.set()
+        if gave_up.is_set() and connection is not None:
+            connection.close()
+            connection = None
+        return connection
+
+    def _fail_start(self, error):
+        """Fails every pending request after the worker could not start."""
+        self.last_status = {'state': 'error', 'ready': False, 'error': error}
+        self._fail_all(error)
+        self.loaded.set()
+
+    def _listen(self, server, authkey, process):
+        """Connects to the worker, then calls the callbacks of its replies."""
+        connection = self._accept(server, authkey, process)
+        if connection is None:
+            if process.poll() is None:
+                process.kill()
+            self._fail_start("The model worker exited or did not connect.")
+            return
+        with self.lock:
+            if self.process is not process:
+                connection.close()  # Stopped while connecting
+                return
+            self.connection = connection
+            for message in self.outbox:
+                self._send(message)
+            self.outbox = []
+
+        while True:
+            try:
+                message = connection.recv()
+            except (OSError, EOFError):
+                print("Model worker connection closed.")
+                self._fail_all("The model worker stopped.")
+                self.loaded.set()
+                return
+            kind = message[0]
+            if kind == 'status':
+                self.last_status = message[1]
+                self.loaded.set()
+                continue
+
+            request_id, payload = message[1], message[2]
+            with self.lock:
+                request = self.requests.get(request_id)
+                if request is None or request.cancelled:
+                    continue
+                if kind != 'line':
+                    del self.requests[request_id]
+                callbacks = self._record(request, kind, payload)
+            self._dispatch(request, kind, payload, callbacks)
+
+    def _record(self, request, kind, payload):
+        """Stores a reply on its request; returns the callbacks to call.
+
+        Called with the lock held, so a callback added by _submit() at the
+        same time either sees the reply replayed or is called with it,
+        never both.
+        """
+        if kind == 'line':
+            request.lines.append(payload)
+            return list(request.line_callbacks)
+        if kind == 'done':
+            request.result = payload
+            return list(request.done_callbacks)
+        request.error = payload
+        return list(request.error_callbacks)
+
+    def _dispatch(self, request, kind, payload, callbacks):
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"Error in model worker callback: {e}")
+                traceback.print_exc()
+        if kind != 'line':
+            request.finished.set()
+
+    def _fail_all(self, error):
+        with self.lock:
+            requests = [(request, self._record(request, 'error', error))
+                        for request in self.requests.values()]
+            self.requests.clear()
+            self.process = None
+        for request, callbacks in requests:
+            self._dispatch(request, 'error', error, callbacks)
+
+
+def worker_main(connection):
+    """Entry point of the worker process."""
+    import ai_suggestions
+
+    send_lock = threading.Lock()
+    cancel_events = {}
+
+    def send(*message):
+        with send_lock:
+            connection.send(message)
+
+    def report_status():
+        ai_suggestions.service.wait_until_ready()
+        send('status', ai_suggestions.get_status())
+
+    def run(request_id, kind, args, cancel_event):
+        try:
+            if kind == 'stream':
+                prompt, current_lyrics, max_lines = args
+                lines = []
+                for line in ai_suggestions.stream_rap_lyrics(
+                        prompt, current_lyrics, max_lines,
+                        cancel_event=cancel_event):
+                    lines.append(line)
+                    send('line', request_id, line)
+                result = lines
+            else:
+                result = ai_suggestions.generate_candidates(
+                    *args, cancel_event=cancel_event)
+            if not cancel_event.is_set():
+                send('done', request_id, result)
+        except Exception as e:
+            if cancel_event.is_set():
+                return  # Nobody is waiting for the result any more
+            traceback.print_exc()
+            send('error', request_id, str(e))
+        finally:
+            cancel_events.pop(request_id, None)
+
+    ai_suggestions.warm_up()
+    threading.Thread(target=report_status, daemon=True).start()
+
+    while True:
+        try:
+            message = connection.recv()
+        except (OSError, EOFError):
+            return
+        if message[0] == 'stop':
+            return
+        if message[0] == 'cancel':
+            event = cancel_events.get(message[1])
+            if event is not None:
+                event.set()
+        elif message[0] == 'submit':
+            _, request_id, kind, args = message
+            cancel_events[request_id] = threading.Event()
+            threading.Thread(target=run, daemon=True,
+                             args=(request_id, kind, args,
+                                   cancel_events[request_id])).start()
+
+
+def main():
+    """Connects to the app at the address in argv and serves requests."""
+    authkey = bytes.fromhex(sys.stdin.readline().strip())
+    connection = Client(sys.argv[1], authkey=authkey)
+    try:
+        worker_main(connection)
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Module for reusing the model's attention cache across similar prompts.
+
+Successive AI suggestions usually share most of their prompt: the lyrics
+only grow by a line or two. The cache keeps the past_key_values of recent
+prompts so generation only has to encode the tokens after the longest
+shared prefix.
+"""
+
+from collections import OrderedDict
+import threading
+
+import config
+
+
+def to_legacy(past_key_values):
+    """Returns the cache as a tuple of (key, value) tensors per layer."""
+    if hasattr(past_key_values, 'to_legacy_cache'):
+        return past_key_values.to_legacy_cache()
+    return tuple(past_key_values)
+
+
+def crop(legacy_cache, length, batch_size=None):
+    """Returns the first length positions of a legacy cache.
+
+    With batch_size, only the first batch_size rows are kept. Slicing
+    makes views, so the stored tensors are never copied here.
+    """
+    return tuple((key[:batch_size, :, :length, :],
+                  value[:batch_size, :, :length, :])
+                 for key, value in legacy_cache)
+
+
+def expand(legacy_cache, batch_size):
+    """Repeats a single-row legacy cache for a batch, without copying."""
+    if batch_size == 1:
+        return legacy_cache
+    return tuple((key.expand(batch_size, -1, -1, -1),
+                  value.expand(batch_size, -1, -1, -1))
+                 for key, value in legacy_cache)
+
+
+def from_legacy(legacy_cache):
+    """Wraps a legacy cache in the cache class the model expects."""
+    try:
+        from transformers import DynamicCache
+    except ImportError:
+        return legacy_cache
+    # DynamicCache appends by concatenation, which creates new tensors,
+    # so generating from it leaves the stored tensors untouched
+    return DynamicCache.from_legacy_cache(legacy_cache)
+
+
+def common_prefix_length(first, second):
+    """Returns the length of the common prefix of two sequences."""
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+    return length
+
+
+class PrefixCache:
+    """LRU cache of attention caches keyed by prompt token ids.
+
+    The total number of cached prompt tokens is capped by max_tokens,
+    which bounds memory since every token costs the same in every layer.
+    """
+
+    def __init__(self, max_tokens=config.KV_CACHE_MAX_TOKENS):
+        self.max_tokens = max_tokens
+        self.entries = OrderedDict()
+        self.total_tokens = 0
+        self.hits = 0
+        self.misses = 0
+        self.reused_tokens = 0
+        self.lock = threading.Lock()
+
+    def lookup(self, token_ids, batch_size=1):
+        """Returns (length, past_key_values) for the longest cached prefix.
+
+        At least the last token is always left uncached, since the model
+        needs one new input to produce the next token. The cache is
+        repeated batch_size times for batched generation. Returns (0, None)
+        when nothing useful is cached.
+        """
+        token_ids = tuple(token_ids)
+        best_key, best_length = None, 0
+        with self.lock:
+            for key in self.entries:
+                length = common_prefix_length(key, token_ids)
+                if length > best_length:
+                    best_key, best_length = key, length
+            best_length = min(best_length, len(token_ids) - 1)
+            if best_key is None or best_length <= 0:
+                self.misses += 1
+                return 0, None
+            self.entries.move_to_end(best_key)
+            legacy_cache = self.entries[best_key]
+            self.hits += 1
+            self.reused_tokens += best_length
+        return best_length, from_legacy(
+            expand(crop(legacy_cache, best_length), batch_size))
+
+    def store(self, token_ids, past_key_values):
+        """Caches the attention cache of a prompt, evicting old prompts.
+
+        Only the first row of a batched cache is kept, since every row
+        shares the same prompt.
+        """
+        token_ids = tuple(token_ids)
+        if not token_ids or len(token_ids) > self.max_tokens:
+            return
+        # Copy the prompt part, so the generated part can be freed
+        legacy_cache = tuple(
+            (key.clone(), value.clone()) for key, value
+            in crop(to_legacy(past_key_values), len(token_ids), 1)
+        )
+        with self.lock:
+            if token_ids in self.entries:
+                self.entries.move_to_end(token_ids)
+                return
+            # A cached prompt that is a prefix of this one is now redundant
+            for key in [key for key in self.entries
+                        if token_ids[:len(key)] == key]:
+                self.total_tokens -= len(key)
+                del self.entries[key]
+            self.entries[token_ids] = legacy_cache
+            self.total_tokens += len(token_ids)
+            while self.total_tokens > self.max_tokens:
+                key, _ = self.entries.popitem(last=False)
+                self.total_tokens -= len(key)
+
+    def clear(self):
+        """Drops every cached prompt."""
+        with self.lock:
+            self.entries.clear()
+            self.total_tokens = 0
+
+    def stats(self):
+        """Returns hit/miss statistics and the number of cached tokens."""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reused_tokens': self.reused_tokens,
+                'entries': len(self.entries),
+                'tokens': self.total_tokens,
+                'max_tokens': self.max_tokens
+            }
@@ -0,0 +1,314 @@
+"""
+Module for compiling and reading a memory-mapped pronunciation dictionary.
+
+A CMU-style pronunciation list ("WORD  W ER1 D" per line) is compiled once
+into a compact binary file. The file is memory-mapped at runtime, so only
+the pages touched by a lookup are read and nothing is parsed at startup.
+
+File layout (all integers little-endian):
+    header         magic, version, word count
+    key offsets    (count + 1) uint32, offsets into the key blob
+    phone offsets  (count + 1) uint32, offsets into the phone blob
+    rhyme order    count uint32 word indices, sorted by rhyme tail
+    key blob       sorted UTF-8 words, concatenated
+    phone blob     one byte per phoneme, concatenated
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import threading
+
+import config
+
+MAGIC = b'RWPD'
+VERSION = 2
+HEADER = struct.Struct('<4sHHI')
+OFFSET = struct.Struct('<I')
+
+# ARPAbet phonemes; vowels carry a stress digit (0, 1 or 2)
+PHONEMES = ('AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH',
+            'IY', 'OW', 'OY', 'UH', 'UW',
+            'B', 'CH', 'D', 'DH', 'F', 'G', 'HH', 'JH', 'K', 'L', 'M', 'N',
+            'NG', 'P', 'R', 'S', 'SH', 'T', 'TH', 'V', 'W', 'Y', 'Z', 'ZH')
+VOWEL_COUNT = 15
+PHONEME_INDEX = {phoneme: index for index, phoneme in enumerate(PHONEMES)}
+
+
+def encode_phoneme(phoneme):
+    """Packs a phoneme such as 'AH1' into a single byte code."""
+    stress = 0
+    if phoneme[-1].isdigit():
+        stress = int(phoneme[-1])
+        phoneme = phoneme[:-1]
+    return PHONEME_INDEX[phoneme] * 3 + stress
+
+
+def decode_phoneme(code):
+    """Unpacks a byte code into a phoneme such as 'AH1'."""
+    index, stress = divmod(code, 3)
+    if index < VOWEL_COUNT:
+        return f"{PHONEMES[index]}{stress}"
+    return PHONEMES[index]
+
+
+def is_vowel(code):
+    """Returns True if the byte code is a vowel."""
+    return code // 3 < VOWEL_COUNT
+
+
+def strip_stress(code):
+    """Returns the byte code of a phoneme without its stress digit."""
+    return code - code % 3
+
+
+def rhyme_tail_codes(codes):
+    """Returns the stressless codes from the last stressed vowel onward.
+
+    Falls back to the last vowel when no vowel carries stress, and to the
+    whole pronunciation when it has no vowel at all.
+    """
+    last_vowel = None
+    for index in range(len(codes) - 1, -1, -1):
+        if is_vowel(codes[index]):
+            if last_vowel is None:
+                last_vowel = index
+            if codes[index] % 3:
+                last_vowel = index
+                break
+    start = last_vowel if last_vowel is not None else 0
+    return bytes(strip_stress(code) for code in codes[start:])
+
+
+def parse_source(source_path):
+    """Reads a CMU-style pronunciation list into a {word: codes} dict.
+
+    Comment lines and alternate pronunciations such as "word(2)" are
+    skipped, as are entries with unknown phonemes.
+    """
+    entries = {}
+    with open(source_path, 'r', encoding='latin-1') as file:
+        for line in file:
+            if not line.strip() or line.startswith(';;;'):
+                continue
+            parts = line.split('#', 1)[0].split()
+            if len(parts) < 2:
+                continue
+            word = parts[0].lower()
+            if word.endswith(')') and '(' in word:
+                continue
+            try:
+                codes = bytes(encode_phoneme(phone) for phone in parts[1:])
+            except (KeyError, ValueError):
+                continue
+            entries.setdefault(word, codes)
+    return entries
+
+
+def compile_dictionary(source_path, output_path):
+    """Compiles a pronunciation list into the binary dictionary format."""
+    entries = parse_source(source_path)
+    keys = sorted(word.encode('utf-8') for word in entries)
+
+    key_offsets = [0]
+    phone_offsets = [0]
+    phones = []
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+        codes = entries[key.decode('utf-8')]
+        phones.append(codes)
+        phone_offsets.append(phone_offsets[-1] + len(codes))
+
+    # Words sharing a rhyme tail, or a prefix of one, end up adjacent
+    rhyme_order = sorted(range(len(keys)),
+                         key=lambda i: (rhyme_tail_codes(phones[i]), keys[i]))
+
+    with open(output_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, len(keys)))
+        file.write(struct.pack(f'<{len(key_offsets)}I', *key_offsets))
+        file.write(struct.pack(f'<{len(phone_offsets)}I', *phone_offsets))
+        file.write(struct.pack(f'<{len(rhyme_order)}I', *rhyme_order))
+        file.write(b''.join(keys))
+        file.write(b''.join(phones))
+
+    print(f"Compiled {len(keys)} pronunciations to {output_path}")
+    return len(keys)
+
+
+class PronunciationDict:
+    """Read-only view of a compiled pronunciation dictionary.
+
+    Words are found by binary search over the sorted keys, and rhymes by
+    binary search over the rhyme order, reading the offset tables straight
+    from the memory map.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a pronunciation dictionary "
+                             f"of version {VERSION}.")
+        self.key_offsets = HEADER.size
+        self.phone_offsets = self.key_offsets + OFFSET.size * (self.count + 1)
+        self.rhyme_order = self.phone_offsets + OFFSET.size * (self.count + 1)
+        self.keys_start = self.rhyme_order + OFFSET.size * self.count
+        self.phones_start = self.keys_start + self._offset(
+            self.key_offsets, self.count)
+
+    def close(self):
+        """Releases the memory map and the underlying file."""
+        self.map.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, word):
+        return self.find(word) is not None
+
+    def _offset(self, table, index):
+        return OFFSET.unpack_from(self.map, table + OFFSET.size * index)[0]
+
+    def key(self, index):
+        """Returns the word stored at the given index."""
+        start = self.keys_start + self._offset(self.key_offsets, index)
+        end = self.keys_start + self._offset(self.key_offsets, index + 1)
+        return self.map[start:end].decode('utf-8')
+
+    def codes(self, index):
+        """Returns the packed phoneme codes stored at the given index."""
+        start = self.phones_start + self._offset(self.phone_offsets, index)
+        end = self.phones_start + self._offset(self.phone_offsets, index + 1)
+        return self.map[start:end]
+
+    def syllables_at(self, index):
+        """Returns the number of syllables of the word at the given index."""
+        return sum(map(is_vowel, self.codes(index)))
+
+    def rhyme_index(self, position):
+        """Returns the word index at a position of the rhyme order."""
+        return self._offset(self.rhyme_order, position)
+
+    def rhyme_key_at(self, position):
+        """Returns the rhyme tail at a position of the rhyme order."""
+        return rhyme_tail_codes(self.codes(self.rhyme_index(position)))
+
+    def _rhyme_bound(self, key):
+        """Returns the first rhyme order position whose tail is >= key."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.rhyme_key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def rhyme_range(self, prefix, exact=False):
+        """Returns the rhyme order positions of tails starting with prefix.
+
+        With exact=True only tails equal to prefix are included. The
+        result is a (start, end) range, empty when nothing matches.
+        """
+        if exact:
+            # No phoneme code is below 0, so longer tails sort after this
+            return self._rhyme_bound(prefix), self._rhyme_bound(prefix + b'\0')
+        if not prefix:
+            return 0, self.count
+        successor = prefix[:-1] + bytes([prefix[-1] + 1])
+        return self._rhyme_bound(prefix), self._rhyme_bound(successor)
+
+    def find(self, word):
+        """Returns the index of a word, or None if it is not present."""
+        target = word.lower().encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = self.keys_start + self._offset(self.key_offsets, middle)
+            end = self.keys_start + self._offset(self.key_offsets,
+                                                 middle + 1)
+            key = self.map[start:end]
+            if key < target:
+                low = middle + 1
+            elif key > target:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def lookup(self, word):
+        """Returns the packed phoneme codes of a word, or None."""
+        index = self.find(word)
+        return None if index is None else self.codes(index)
+
+    def phonemes(self, word):
+        """Returns the ARPAbet phonemes of a word, or None."""
+        codes = self.lookup(word)
+        return None if codes is None else [decode_phoneme(c) for c in codes]
+
+    def syllables(self, word):
+        """Returns the number of syllables of a word, or None."""
+        index = self.find(word)
+        return None if index is None else self.syllables_at(index)
+
+    def stress_pattern(self, word):
+        """Returns the stress digits of a word's vowels, e.g. '10'."""
+        codes = self.lookup(word)
+        if codes is None:
+            return None
+        return ''.join(str(code % 3) for code in codes if is_vowel(code))
+
+    def rhyme_key(self, word):
+        """Returns the packed rhyme tail of a word, or None."""
+        codes = self.lookup(word)
+        return None if codes is None else rhyme_tail_codes(codes)
+
+    def rhyme_tail(self, word):
+        """Returns the phonemes from the last stressed vowel onward."""
+        key = self.rhyme_key(word)
+        if key is None:
+            return None
+        return tuple(PHONEMES[code // 3] for code in key)
+
+
+def get_dictionary_path():
+    """Returns the path of the compiled dictionary in the app directory."""
+    return os.path.join(os.path.expanduser("~"), config.BASE_DIR,
+                        config.PRONUNCIATION_DICT_FILE)
+
+
+_dictionary = None
+_dictionary_loaded = False
+_dictionary_lock = threading.Lock()
+
+
+def get_dictionary():
+    """Returns the shared pronunciation dictionary, or None if not built."""
+    global _dictionary, _dictionary_loaded
+    with _dictionary_lock:
+        if not _dictionary_loaded:
+            _dictionary_loaded = True
+            path = get_dictionary_path()
+            if os.path.exists(path):
+                try:
+                    _dictionary = PronunciationDict(path)
+                except (OSError, ValueError) as e:
+                    print(f"Error opening pronunciation dictionary: {e}")
+            else:
+                print(f"Pronunciation dictionary {path} not found.")
+        return _dictionary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compile a CMU-style pronunciation list.")
+    parser.add_argument('source', help="Path to the pronunciation list")
+    parser.add_argument('output', nargs='?', default=get_dictionary_path(),
+                        help="Path of the compiled dictionary")
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    compile_dictionary(args.source, args.output)
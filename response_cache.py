@@ -0,0 +1,224 @@
+"""
+Module for caching API responses on disk across app restarts.
+
+Responses are stored in a SQLite database in the app directory, keyed by
+endpoint and word. Entries expire after a TTL and the least recently used
+ones are evicted once the cache grows past its byte-size cap.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+
+class ResponseCache:
+    """Persistent response cache with TTL expiry and LRU size eviction."""
+
+    def __init__(self, path, ttl=config.RESPONSE_CACHE_TTL,
+                 max_bytes=config.RESPONSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "endpoint TEXT NOT NULL, word TEXT NOT NULL, value TEXT NOT NULL,"
+            "size INTEGER NOT NULL, created REAL NOT NULL,"
+            "accessed REAL NOT NULL, PRIMARY KEY (endpoint, word))"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed "
+            "ON responses (accessed)"
+        )
+        self.connection.commit()
+        self.total_bytes = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, endpoint, word):
+        """Returns the cached response, or None if missing or expired."""
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, size, created FROM responses "
+                "WHERE endpoint = ? AND word = ?", (endpoint, word)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, size, created = row
+            if now - created > self.ttl:
+                self._delete(endpoint, word, size)
+                self.connection.commit()
+                self.misses += 1
+                return None
+            self.connection.execute(
+                "UPDATE responses SET accessed = ? "
+                "WHERE endpoint = ? AND word = ?", (now, endpoint, word)
+            )
+            self.connection.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, endpoint, word, response):
+        """Stores a JSON-serializable response, evicting old entries."""
+        value = json.dumps(response)
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT size FROM responses WHERE endpoint = ? AND word = ?",
+                (endpoint, word)
+            ).fetchone()
+            if row is not None:
+                self._delete(endpoint, word, row[0])
+            self.connection.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (endpoint, word, value, size, now, now)
+            )
+            self.total_bytes += size
+            self._evict()
+            self.connection.commit()
+
+    def get_many(self, endpoint, words):
+        """Returns {word: response} of the cached words, in one transaction.
+
+        Missing and expired words are left out.
+        """
+        now = time.time()
+        found = {}
+        with self.lock:
+            for word in words:
+                row = self.connection.execute(
+                    "SELECT value, created FROM responses "
+                    "WHERE endpoint = ? AND word = ?", (endpoint, word)
+                ).fetchone()
+                if row is None or now - row[1] > self.ttl:
+                    self.misses += 1
+                    continue
+                found[word] = json.loads(row[0])
+                self.hits += 1
+            self.connection.executemany(
+                "UPDATE responses SET accessed = ? "
+                "WHERE endpoint = ? AND word = ?",
+                [(now, endpoint, word) for word in found]
+            )
+            self.connection.commit()
+        return found
+
+    def set_many(self, endpoint, responses):
+        """Stores a {word: response} dict in one transaction."""
+        now = time.time()
+        with self.lock:
+            for word, response in responses.items():
+                value = json.dumps(response)
+                size = len(value.encode('utf-8'))
+                if size > self.max_bytes:
+                    continue
+                row = self.connection.execute(
+                    "SELECT size FROM responses "
+                    "WHERE endpoint = ? AND word = ?", (endpoint, word)
+                ).fetchone()
+                if row is not None:
+                    self._delete(endpoint, word, row[0])
+                self.connection.execute(
+                    "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (endpoint, word, value, size, now, now)
+                )
+                self.total_bytes += size
+            self._evict()
+            self.connection.commit()
+
+    def get_or_fetch(self, endpoint, word, fetch):
+        """Returns the cached response, calling fetch() on a miss.
+
+        Empty responses are not stored, since they usually mean the
+        request failed.
+        """
+        response = self.get(endpoint, word)
+        if response is None:
+            response = fetch()
+            if response:
+                self.set(endpoint, word, response)
+        return response
+
+    def _delete(self, endpoint, word, size):
+        self.connection.execute(
+            "DELETE FROM responses WHERE endpoint = ? AND word = ?",
+            (endpoint, word)
+        )
+        self.total_bytes -= size
+
+    def _evict(self):
+        """Removes expired, then least recently used, entries over the cap."""
+        if self.total_bytes <= self.max_bytes:
+            return
+        self.connection.execute("DELETE FROM responses WHERE created < ?",
+                                (time.time() - self.ttl,))
+        self.total_bytes = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        rows = self.connection.execute(
+            "SELECT endpoint, word, size FROM responses ORDER BY accessed")
+        victims = []
+        for endpoint, word, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            victims.append((endpoint, word))
+            self.total_bytes -= size
+        self.connection.executemany(
+            "DELETE FROM responses WHERE endpoint = ? AND word = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self):
+        """Removes every cached response and resets the statistics."""
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+            self.total_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns the hit/miss statistics and size of the cache."""
+        with self.lock:
+            entries = self.connection.execute(
+                "SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def close(self):
+        """Closes the underlying database."""
+        with self.lock:
+            self.connection.close()
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Returns the shared response cache in the app directory."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            app_dir = os.path.join(os.path.expanduser("~"), config.BASE_DIR)
+            os.makedirs(app_dir, exist_ok=True)
+            _response_cache = ResponseCache(
+                os.path.join(app_dir, config.RESPONSE_CACHE_FILE))
+        return _response_cache
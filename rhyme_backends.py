@@ -0,0 +1,125 @@
+"""
+Module with the pluggable backends used to look up single-word rhymes.
+
+The local backend works offline on the compiled pronunciation dictionary.
+The Datamuse backend queries the Datamuse API and is used as a fallback.
+"""
+
+import config
+from datamuse_client import get_client
+from pronunciation_dict import get_dictionary
+
+# Rhyme kinds, best first
+PERFECT, NEAR, SLANT = 'perfect', 'near', 'slant'
+
+
+class RhymeBackend:
+    """Base class for rhyme backends."""
+
+    name = None
+
+    def fetch_rhymes(self, word, max_results=config.MAX_RHYME_RESULTS):
+        """Returns a ranked list of words that rhyme with the given word."""
+        raise NotImplementedError
+
+    def fetch_many(self, words, max_results=config.MAX_RHYME_RESULTS):
+        """Returns {word: rhymes} for several words."""
+        return {word: self.fetch_rhymes(word, max_results) for word in words}
+
+
+class LocalRhymeBackend(RhymeBackend):
+    """Finds rhymes offline in the compiled pronunciation dictionary.
+
+    Words are ranked as perfect rhymes (same rhyme tail), near rhymes (same
+    stressed vowel and following phoneme) and slant rhymes (same stressed
+    vowel), then by how close their syllable count is to the word's.
+    """
+
+    name = 'local'
+
+    def __init__(self, dictionary=None):
+        self.dictionary = dictionary
+
+    def get_dictionary(self):
+        """Returns the dictionary of this backend, or the shared one."""
+        if self.dictionary is not None:
+            return self.dictionary
+        return get_dictionary()
+
+    def fetch_ranked(self, word, max_results=config.MAX_RHYME_RESULTS):
+        """Returns (rhyme, kind) pairs for the word, best first."""
+        dictionary = self.get_dictionary()
+        if dictionary is None:
+            return []
+        word = word.lower()
+        key = dictionary.rhyme_key(word)
+        if not key:
+            return []
+        syllables = dictionary.syllables(word)
+
+        ranked = []
+        seen = {word}
+        # Each tier is a narrower prefix of the rhyme tail, so the
+        # candidates of a tier are one contiguous range of the rhyme order
+        tiers = ((PERFECT, key, True), (NEAR, key[:2], False),
+                 (SLANT, key[:1], False))
+        for kind, prefix, exact in tiers:
+            if len(ranked) >= max_results:
+                break
+            if kind == NEAR and len(key) < 2:
+                continue
+            start, end = dictionary.rhyme_range(prefix, exact)
+            tier = []
+            for position in range(start, end):
+                index = dictionary.rhyme_index(position)
+                candidate = dictionary.key(index)
+                if candidate in seen or not is_plain_word(candidate):
+                    continue
+                seen.add(candidate)
+                distance = abs(dictionary.syllables_at(index) - syllables)
+                tier.append((distance, candidate))
+                if len(tier) >= max_results * 4:
+                    break
+            tier.sort()
+            ranked.extend((candidate, kind) for _, candidate in tier)
+
+        return ranked[:max_results]
+
+    def fetch_rhymes(self, word, max_results=config.MAX_RHYME_RESULTS):
+        return [rhyme for rhyme, _ in self.fetch_ranked(word, max_results)]
+
+
+class DatamuseRhymeBackend(RhymeBackend):
+    """Fetches rhymes from the Datamuse API through the shared client."""
+
+    name = 'datamuse'
+
+    def fetch_rhymes(self, word, max_results=config.MAX_RHYME_RESULTS):
+        return get_client().words('rel_rhy', word, max_results)
+
+    def fetch_many(self, words, max_results=config.MAX_RHYME_RESULTS):
+        results = get_client().fetch_batch_sync(words, ('rel_rhy',),
+                                                max_results)
+        return {word: results[word]['rel_rhy'] for word in words}
+
+
+def is_plain_word(word):
+    """Returns True for words made of letters and inner apostrophes."""
+    return word.replace("'", '').isalpha() and word[0] != "'"
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (LocalRhymeBackend, DatamuseRhymeBackend)
+}
+
+_backends = None
+
+
+def get_backends():
+    """Returns the configured rhyme backends, in the order to try them."""
+    global _backends
+    if _backends is None:
+        _backends = [BACKENDS[name]() for name in config.RHYME_BACKENDS
+                     if name in BACKENDS]
+    return _backends
@@ -1,30 +1,66 @@
 """
 Module for detecting rhymes in text and categorizing them by rhyme type.
+
+Words are keyed by their phonetic rhyme tail (the last stressed vowel
+onward) from the compiled pronunciation dictionary. Words missing from the
+dictionary fall back to a spelling-based tail.
 """
 
 import re
-from collections import defaultdict
+from functools import lru_cache
+
+from pronunciation_dict import get_dictionary
+from tokenizer import tokenize
+
+SPELLING_TAIL_PATTERN = re.compile(r'[aeiouy]+[^aeiouy]*$')
+
+
+def spelling_rhyme_key(word):
+    """Returns the last vowel group of a word and the letters after it."""
+    stem, silent_e = word, ''
+    if len(word) > 2 and word.endswith('e') and word[-2] not in 'aeiouy':
+        # Treat a final silent 'e' as part of the previous vowel group
+        stem, silent_e = word[:-1], 'e'
+    match = SPELLING_TAIL_PATTERN.search(stem)
+    return (match.group() if match else stem) + silent_e
+
+
+@lru_cache(maxsize=4096)
+def rhyme_key(word):
+    """Returns the rhyme family key of a lowercase word.
+
+    Dictionary words yield the packed phonetic rhyme tail (bytes), other
+    words yield their spelling tail (str), so the two never collide.
+    """
+    dictionary = get_dictionary()
+    if dictionary is not None:
+        key = dictionary.rhyme_key(word)
+        if key is not None:
+            return key
+    return spelling_rhyme_key(word)
 
 
 def detect_rhymes(text):
-    """Detects rhymes in the text and categorizes them by rhyme type."""
-    words = re.findall(r'\b\w+\b', text.lower())
+    """Detects rhymes in the text and categorizes them by rhyme type.
+
+    Returns a {word: group id} dict holding every word that rhymes with
+    at least one other word. Group ids are numbered from 1 in the order
+    each rhyme family first appears in the text.
+    """
+    families = {}
+
+    # Single pass: collect the distinct words of each rhyme family
+    for word in tokenize(text).words():
+        family = families.setdefault(rhyme_key(word), {})
+        family.setdefault(word, None)
+
     rhyme_groups = {}
-    suffix_dict = defaultdict(list)
     group_index = 1
-
-    # Group words by their last two and three characters
-    for word in words:
-        if len(word) >= 2:
-            suffix_dict[word[-2:]].append(word)
-        if len(word) >= 3:
-            suffix_dict[word[-3:]].append(word)
-
-    # Assign group indices based on suffix groups
-    for group in suffix_dict.values():
-        for word in group:
-            if word not in rhyme_groups:
-                rhyme_groups[word] = group_index
-                group_index += 1
+    for family in families.values():
+        if len(family) < 2:
+            continue
+        for word in family:
+            rhyme_groups[word] = group_index
+        group_index += 1
 
     return rhyme_groups
@@ -1,21 +1,29 @@
 """Module for generating rhymes and similar-sounding
-   words using the Datamuse API."""
+   words using the rhyme backends and the Datamuse API."""
 
-from concurrent.futures import ThreadPoolExecutor
-from itertools import product
+import heapq
 from functools import lru_cache
-import requests
 from kivy.clock import Clock
+import config
+from datamuse_client import get_client
+from rhyme_backends import get_backends
+from response_cache import get_response_cache
 
 MIN_WORDS_IN_PHRASE = 2
 MAX_WORDS_IN_PHRASE = 7
 
 
-def fetch_rhymes(words):
-    """Fetches rhymes for single or multiple words."""
+def fetch_rhymes(words, stream=False):
+    """Fetches rhymes for single or multiple words.
+
+    With stream=True, multi-word rhymes are returned as a generator of
+    (word_count, phrase) pairs instead of a dict.
+    """
     print(f"Fetching rhymes for: {words}")
     if len(words) == 1:
         result = fetch_single_word_rhymes(words[0])
+    elif stream:
+        return stream_rhymes_for_multiple_words(words)
     else:
         result = fetch_rhymes_for_multiple_words(words)
     print(f"Fetch rhymes result: {result}")  # Add this line
@@ -23,21 +31,19 @@ def fetch_rhymes(words):
 
 
 def fetch_single_word_rhymes(word):
-    """Fetches single-word rhymes using the Datamuse API."""
+    """Fetches single-word rhymes from the first backend that has any."""
     if not word:
         print("No word provided for fetching rhymes.")
         return []
 
-    url = f"https://api.datamuse.com/words?rel_rhy={word}"
-    try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        rhymes = [item['word'] for item in response.json()]
-        print(f"Single-word rhymes for '{word}': {rhymes}")
-        return rhymes
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception: {e}")
-        return []
+    for backend in get_backends():
+        rhymes = backend.fetch_rhymes(word)
+        if rhymes:
+            print(f"Single-word rhymes for '{word}' "
+                  f"({backend.name}): {rhymes}")
+            return rhymes
+    print(f"No rhymes found for '{word}'.")
+    return []
 
 
 def fetch_rhymes_for_multiple_words(words):
@@ -47,40 +53,117 @@ def fetch_rhymes_for_multiple_words(words):
               "generation.")
         return []
 
-    with ThreadPoolExecutor() as executor:
-        rhymes_list = list(executor.map(fetch_single_word_rhymes, words))
-    return combine_rhymes(rhymes_list)
+    return combine_rhymes(fetch_rhyme_lists(words))
+
+
+def stream_rhymes_for_multiple_words(words):
+    """Returns an iterator of (word_count, phrase) multi-word rhymes.
+
+    The rhymes of each word are fetched right away, by the caller, so
+    only the in-memory combining is left for whoever consumes the
+    iterator, best phrases first.
+    """
+    if len(words) < 2:
+        print("Please provide at least two words for multi-word rhyme "
+              "generation.")
+        return iter(())
+    rhymes_list = fetch_rhyme_lists(words)
+    print(f"Rhyme lists fetched: {rhymes_list}")
+    return stream_combined_rhymes(rhymes_list)
+
+
+def fetch_rhyme_lists(words):
+    """Fetches the ranked rhymes of each word, in the order of the words."""
+    # Each backend is asked once for all words it can still help with,
+    # so the network fallback costs a single parallel round of requests
+    found = {}
+    pending = list(dict.fromkeys(words))
+    for backend in get_backends():
+        if not pending:
+            break
+        found.update({word: rhymes for word, rhymes
+                      in backend.fetch_many(pending).items() if rhymes})
+        pending = [word for word in pending if word not in found]
+
+    return [found.get(word, []) for word in words]
 
 
 def fetch_from_api(url, log_message):
-    """Fetches data from the Datamuse API."""
-    try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        result = [item['word'] for item in response.json()]
-        print(f"{log_message}: {result}")
-        return result
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception: {e}")
+    """Fetches data from the Datamuse API, through the response cache."""
+    return get_response_cache().get_or_fetch(
+        'url', url, lambda: request_from_api(url, log_message))
+
+
+def request_from_api(url, log_message):
+    """Requests data from the Datamuse API."""
+    items = get_client().get(url)
+    if items is None:
         return []
+    result = [item['word'] for item in items]
+    print(f"{log_message}: {result}")
+    return result
 
 
-def combine_rhymes(rhymes_list):
+def combine_rhymes(rhymes_list, top_k=config.MAX_COMBINED_RHYMES):
     """Combines rhymes from each word to create multi-word rhymes."""
     if len(rhymes_list) < 2:
         print("Not enough rhymes lists to combine.")
         return {}
 
     combined_rhymes = {}
-    for word_count in range(MIN_WORDS_IN_PHRASE, min(MAX_WORDS_IN_PHRASE, len(rhymes_list)) + 1):
-        combinations = product(*rhymes_list[:word_count])
-        logical_combinations = [' '.join(combo) for combo in combinations if is_logical_phrase(' '.join(combo))]
-        if logical_combinations:
-            combined_rhymes[word_count] = logical_combinations
+    for word_count, phrase in stream_combined_rhymes(rhymes_list, top_k):
+        combined_rhymes.setdefault(word_count, []).append(phrase)
 
     return combined_rhymes
 
 
+def stream_combined_rhymes(rhymes_list, top_k=config.MAX_COMBINED_RHYMES):
+    """Yields (word_count, phrase) pairs, longest phrases first.
+
+    Each phrase length yields at most top_k phrases, in score order.
+    """
+    longest = min(MAX_WORDS_IN_PHRASE, len(rhymes_list))
+    for word_count in range(longest, MIN_WORDS_IN_PHRASE - 1, -1):
+        for phrase in iter_ranked_phrases(rhymes_list[:word_count], top_k):
+            yield word_count, phrase
+
+
+def iter_ranked_phrases(rhymes_list, top_k=config.MAX_COMBINED_RHYMES,
+                        max_expansions=config.MAX_COMBINER_EXPANSIONS):
+    """Yields phrases combining one rhyme per list, best first.
+
+    A phrase scores the sum of the ranks of its words in their lists.
+    The search is best-first over rank tuples: it starts at the top rhyme
+    of every list and only ever expands the best phrase seen so far, so
+    at most max_expansions phrases are built and the frontier holds at
+    most len(rhymes_list) new entries per expansion.
+    """
+    if not rhymes_list or not all(rhymes_list):
+        return
+
+    start = (0,) * len(rhymes_list)
+    frontier = [(0, start)]
+    seen = {start}
+    yielded = 0
+    expansions = 0
+    while frontier and yielded < top_k and expansions < max_expansions:
+        score, ranks = heapq.heappop(frontier)
+        expansions += 1
+        phrase = ' '.join(rhymes[rank]
+                          for rhymes, rank in zip(rhymes_list, ranks))
+        if is_logical_phrase(phrase):
+            yield phrase
+            yielded += 1
+
+        for position, rank in enumerate(ranks):
+            if rank + 1 < len(rhymes_list[position]):
+                successor = (ranks[:position] + (rank + 1,)
+                             + ranks[position + 1:])
+                if successor not in seen:
+                    seen.add(successor)
+                    heapq.heappush(frontier, (score + 1, successor))
+
+
 @lru_cache(maxsize=128)
 def is_logical_phrase(phrase):
     """Determines if a phrase is logical for a rhyme."""
@@ -94,13 +177,6 @@ def fetch_similar_sounding(word):
         print("No word provided for fetching similar sounds.")
         return []
 
-    try:
-        url = f"https://api.datamuse.com/words?sl={word}&max=20"
-        response_similar = requests.get(url, timeout=5)
-        response_similar.raise_for_status()
-        similar_sounding = [item['word'] for item in response_similar.json()]
-        print(f"Words that sound like '{word}': {similar_sounding}")
-        return similar_sounding
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception in fetch_similar_sounding: {e}")
-        return []
+    similar_sounding = get_client().words('sl', word, 20)
+    print(f"Words that sound like '{word}': {similar_sounding}")
+    return similar_sounding
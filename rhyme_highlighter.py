@@ -1,27 +1,139 @@
 """
 Module for highlighting rhymes in the lyrics input.
+
+Highlighting keeps the original layout: only the words are wrapped in
+color markup, and the spaces, punctuation and line breaks between them
+are kept as they are, escaped for Kivy markup.
 """
 
-import re
+from rhyme_detector import rhyme_key
+from tokenizer import changed_line_range, tokenize
+
+COLOR_CODES = {1: "ff0000", 2: "00ff00",
+               3: "0000ff", 4: "ffff00", 5: "ff00ff"}
+
+
+def escape_markup(text):
+    """Escapes the characters Kivy markup treats specially."""
+    return text.replace('&', '&amp;').replace('[', '&bl;').replace(']', '&br;')
+
+
+def group_color(group):
+    """Returns the color code of a rhyme group id."""
+    return COLOR_CODES.get(group % 5 + 1, "000000")
+
+
+def render_line(line, tokens, color_of):
+    """Returns the markup of a line.
+
+    tokens are the (start, end, word) spans of the line's words, and
+    color_of(word) returns the color code of a word, or None.
+    """
+    parts = []
+    position = 0
+    for start, end, word in tokens:
+        color = color_of(word)
+        if color is None:
+            continue
+        parts.append(escape_markup(line[position:start]))
+        parts.append(f"[color={color}]{escape_markup(line[start:end])}[/color]")
+        position = end
+    parts.append(escape_markup(line[position:]))
+    return ''.join(parts)
 
 
 def highlight_rhymes(text, rhyme_groups):
     """Highlights rhymes in the lyrics input."""
-    word_pattern = re.compile(r'\W+')
-    color_codes = {1: "ff0000", 2: "00ff00",
-                   3: "0000ff", 4: "ffff00", 5: "ff00ff"}
-    highlighted_text_parts = []
-    words = text.split()
-
-    for word in words:
-        clean_word = word_pattern.sub('', word).lower()
-        # Remove punctuation and convert to lowercase for matching
-        if clean_word in rhyme_groups:
-            color_code = color_codes.get(rhyme_groups
-                                         [clean_word] % 5 + 1, "000000")
-            highlighted_text_parts.append(
-                f"[color={color_code}]{word}[/color]")
-        else:
-            highlighted_text_parts.append(word)
-
-    return ' '.join(highlighted_text_parts)
+    def color_of(word):
+        group = rhyme_groups.get(word)
+        return group_color(group) if group is not None else None
+
+    table = tokenize(text)
+    return '\n'.join(render_line(line, tokens, color_of) for line, tokens
+                     in zip(table.lines, table.line_tokens))
+
+
+class RhymeHighlighter:
+    """Keeps the rhyme markup of each line and re-renders only what changed.
+
+    Words are grouped by rhyme family like rhyme_detector.detect_rhymes: a
+    family is colored once it holds two distinct words. A family keeps its
+    color while it stays colored, so editing one line only re-renders that
+    line, plus the lines of the families whose color changed.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.line_tokens = []
+        self.line_keys = []
+        self.line_markup = []
+        self.families = {}  # rhyme key -> {word: occurrences}
+        self.groups = {}  # rhyme key -> group id of colored families
+        self.next_group = 1
+
+    def update(self, text):
+        """Returns the markup of the text, re-rendering only changed lines."""
+        table = tokenize(text)
+        new_lines = table.lines
+        start, old_end, new_end = changed_line_range(self.lines, new_lines)
+
+        touched_keys = set()
+        for tokens in self.line_tokens[start:old_end]:
+            for _, _, word in tokens:
+                touched_keys.add(self._count(word, -1))
+        added_tokens = table.line_tokens[start:new_end]
+        added_keys = []
+        for tokens in added_tokens:
+            keys = {self._count(word, 1) for _, _, word in tokens}
+            touched_keys |= keys
+            added_keys.append(keys)
+
+        self.lines = new_lines
+        self.line_tokens[start:old_end] = added_tokens
+        self.line_keys[start:old_end] = added_keys
+        self.line_markup[start:old_end] = [None] * (new_end - start)
+
+        recolored = self._update_groups(touched_keys)
+        for index, keys in enumerate(self.line_keys):
+            if self.line_markup[index] is None or not recolored.isdisjoint(keys):
+                self.line_markup[index] = render_line(
+                    self.lines[index], self.line_tokens[index], self._color_of)
+        return '\n'.join(self.line_markup)
+
+    def rhyme_groups(self):
+        """Returns the {word: group id} of every colored word."""
+        return {word: group for key, group in self.groups.items()
+                for word in self.families[key]}
+
+    def reset(self):
+        """Forgets all cached lines and rhyme groups."""
+        self.__init__()
+
+    def _count(self, word, delta):
+        """Adds delta occurrences of a word; returns its rhyme key."""
+        key = rhyme_key(word)
+        family = self.families.setdefault(key, {})
+        family[word] = family.get(word, 0) + delta
+        if family[word] <= 0:
+            del family[word]
+            if not family:
+                del self.families[key]
+        return key
+
+    def _update_groups(self, keys):
+        """Colors or uncolors the given families; returns those changed."""
+        recolored = set()
+        for key in keys:
+            colored = len(self.families.get(key, ())) >= 2
+            if colored and key not in self.groups:
+                self.groups[key] = self.next_group
+                self.next_group += 1
+                recolored.add(key)
+            elif not colored and key in self.groups:
+                del self.groups[key]
+                recolored.add(key)
+        return recolored
+
+    def _color_of(self, word):
+        group = self.groups.get(rhyme_key(word))
+        return group_color(group) if group is not None else None
@@ -0,0 +1,244 @@
+"""
+Module with the word lists behind the spell check.
+
+UserDictionary holds the words that are always accepted: built-in rap
+slang and contractions plus the words the user added, saved in the app
+directory. Accepting them is a set lookup, so they never reach the slow
+candidate search.
+
+SymSpellIndex finds the corrections one edit away with the symmetric
+delete method: every dictionary word is stored under itself and each
+string obtained by deleting one of its characters, so a misspelled word
+only needs its own few deletes looked up, instead of generating and
+checking every edit of it. Those keys are hashed with CRC-32, which is
+the same in every run, and packed with the word ids into one sorted
+array. The array is saved to the app directory and loaded back in one
+read, so the index is only rebuilt when the word list changes. Words with
+no correction one edit away are left to the spell checker's own, slower,
+search.
+"""
+
+from array import array
+from bisect import bisect_left
+import os
+import struct
+import sys
+import threading
+import zlib
+
+import config
+
+SLANG_WORDS = (
+    "ain't", 'aint', 'bout', 'cause', 'cuz', 'dat', 'dem', 'dis', 'dunno',
+    'em', 'finna', 'gimme', 'gon', 'gonna', 'gotta', 'holla', 'imma',
+    "in'", 'kinda', 'lemme', 'lil', 'lotta', 'mama', 'nah', 'nothin',
+    'outta', 'sorta', 'til', 'tho', 'thru', 'tryna', 'wanna', 'whatchu',
+    'ya', "y'all", 'yall', 'yo', 'yuh'
+)
+ID_BITS = 24  # Bits of an index entry that hold the word id
+INDEX_MAGIC = b'RWSI'
+INDEX_VERSION = 2
+# Magic, version, signature of the word list and number of entries
+INDEX_HEADER = struct.Struct('<4sIIQ')
+
+
+def get_app_path(filename):
+    """Returns the path of a file in the app directory."""
+    return os.path.join(os.path.expanduser("~"), config.BASE_DIR, filename)
+
+
+class UserDictionary:
+    """Slang and user words that spell check always accepts."""
+
+    def __init__(self, path=None, slang=SLANG_WORDS):
+        self.path = path or get_app_path(config.USER_DICTIONARY_FILE)
+        self.slang = frozenset(slang)
+        self.user_words = set()
+        self.lock = threading.Lock()
+        self.load()
+
+    def __contains__(self, word):
+        word = word.lower()
+        return word in self.slang or word in self.user_words
+
+    def words(self):
+        """Returns every accepted word."""
+        with self.lock:
+            return self.slang | self.user_words
+
+    def load(self):
+        """Loads the user's words, one per line."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                words = {line.strip().lower() for line in file}
+        except FileNotFoundError:
+            return
+        with self.lock:
+            self.user_words = words - {''}
+
+    def add(self, word):
+        """Adds a word to the user's dictionary and saves it."""
+        word = word.strip().lower()
+        with self.lock:
+            if not word or word in self.user_words:
+                return
+            self.user_words.add(word)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(word + '\n')
+        print(f"Added '{word}' to the user dictionary")
+
+
+def single_deletes(word):
+    """Returns the word and every string made by deleting one character."""
+    return {word} | {word[:index] + word[index + 1:]
+                     for index in range(len(word))}
+
+
+def one_edit_apart(first, second):
+    """Returns True if two words differ by exactly one edit.
+
+    An edit is an insertion, a deletion, a substitution or the
+    transposition of two adjacent characters.
+    """
+    if first == second:
+        return False
+    if len(first) == len(second):
+        mismatches = [index for index in range(len(first))
+                      if first[index] != second[index]]
+        if len(mismatches) == 1:
+            return True
+        return (len(mismatches) == 2 and mismatches[1] == mismatches[0] + 1
+                and first[mismatches[0]] == second[mismatches[1]]
+                and first[mismatches[1]] == second[mismatches[0]])
+    if abs(len(first) - len(second)) != 1:
+        return False
+    shorter, longer = sorted((first, second), key=len)
+    index = 0
+    while index < len(shorter) and shorter[index] == longer[index]:
+        index += 1
+    return shorter[index:] == longer[index + 1:]
+
+
+def entry_key(variant):
+    """Returns the lowest index entry stored under a delete string."""
+    return zlib.crc32(variant.encode('utf-8')) << ID_BITS
+
+
+def words_signature(words):
+    """Returns a checksum of a word list, in order, to detect changes."""
+    checksum = 0
+    for word in words:
+        checksum = zlib.crc32(word.encode('utf-8') + b'\n', checksum)
+    return checksum
+
+
+class SymSpellIndex:
+    """Symmetric delete index from misspellings to the words one edit away.
+
+    frequencies maps lowercase dictionary words to their usage frequency.
+    Every entry of the index is the hash of a delete string and the id of
+    a word stored under it, packed into one integer, so the index is a
+    single array rather than a dict of lists. entries, as saved by save(),
+    skips building it.
+    """
+
+    def __init__(self, frequencies, entries=None):
+        if len(frequencies) >= 1 << ID_BITS:
+            raise ValueError(f"Too many words for the spell index: "
+                             f"{len(frequencies)}")
+        self.words = list(frequencies)
+        self.frequencies = array('Q', frequencies.values())
+        if entries is None:
+            entries = array('Q', sorted(
+                entry_key(variant) | word_id
+                for word_id, word in enumerate(self.words)
+                for variant in single_deletes(word)))
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.words)
+
+    def lookup(self, word, max_results=None):
+        """Returns the dictionary words one edit away, most frequent first.
+
+        Returns an empty list if there are none; the word itself is never
+        included.
+        """
+        word = word.lower()
+        word_ids = set()
+        for variant in single_deletes(word):
+            key = entry_key(variant)
+            start = bisect_left(self.entries, key)
+            end = bisect_left(self.entries, key + (1 << ID_BITS), start)
+            word_ids.update(entry & ((1 << ID_BITS) - 1)
+                            for entry in self.entries[start:end])
+        # Hashes can collide, so every hit is checked
+        ranked = sorted(
+            (word_id for word_id in word_ids
+             if one_edit_apart(word, self.words[word_id])),
+            key=lambda word_id: (-self.frequencies[word_id],
+                                 self.words[word_id]))
+        if max_results:
+            ranked = ranked[:max_results]
+        return [self.words[word_id] for word_id in ranked]
+
+    def save(self, path):
+        """Saves the entries, replacing the file atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entries = self.entries
+        if sys.byteorder != 'little':
+            entries = array('Q', entries)
+            entries.byteswap()
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION,
+                                         words_signature(self.words),
+                                         len(entries)))
+            entries.tofile(file)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path, frequencies):
+        """Loads the index of frequencies' words saved by save().
+
+        Returns None if the file is missing, damaged, or was saved for a
+        different word list.
+        """
+        try:
+            with open(path, 'rb') as file:
+                magic, version, signature, count = INDEX_HEADER.unpack(
+                    file.read(INDEX_HEADER.size))
+                if (magic != INDEX_MAGIC or version != INDEX_VERSION
+                        or signature != words_signature(frequencies)):
+                    print(f"Spell index {path} is out of date.")
+                    return None
+                entries = array('Q')
+                entries.fromfile(file, count)
+        except (OSError, EOFError, struct.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Error loading spell index {path}: {e}")
+            return None
+        if sys.byteorder != 'little':
+            entries.byteswap()
+        return cls(frequencies, entries)
+
+
+def get_symspell_index(frequencies, extra_words=()):
+    """Loads the saved index of a dictionary, or builds and saves it.
+
+    frequencies maps the dictionary words to their usage frequency;
+    extra_words, such as slang, are added with the lowest frequency.
+    """
+    words = dict.fromkeys((word.lower() for word in extra_words), 1)
+    words.update(frequencies)
+    path = get_app_path(config.SYMSPELL_INDEX_FILE)
+    index = SymSpellIndex.load(path, words)
+    if index is None:
+        print(f"Building spell index of {len(words)} words...")
+        index = SymSpellIndex(words)
+        try:
+            index.save(path)
+        except OSError as e:
+            print(f"Error saving spell index {path}: {e}")
+    return index
@@ -0,0 +1,137 @@
+"""
+Module for spell checking a whole document in one pass.
+
+The index checks every unique word of the text at once and caches the
+verdict and the correction candidates of each word, so a long song, and
+every later check of it, costs one lookup per distinct word. Misspellings
+are reported with their character offsets, so corrections can be applied
+as span edits that keep the rest of the text, line breaks included,
+untouched.
+"""
+
+from collections import namedtuple
+import threading
+
+from tokenizer import tokenize
+
+MAX_CANDIDATES = 5  # Corrections offered per misspelled word
+
+Misspelling = namedtuple('Misspelling', ['word', 'start', 'end', 'candidates'])
+
+
+def match_case(replacement, word):
+    """Returns the replacement with the capitalization of the word."""
+    if word.isupper() and len(word) > 1:
+        return replacement.upper()
+    if word[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+def apply_correction(text, misspelling, replacement):
+    """Replaces the misspelled span of the text.
+
+    Returns (new_text, delta), where delta is the change in length that
+    later offsets must be shifted by. Raises ValueError if the span no
+    longer holds the misspelled word.
+    """
+    if text[misspelling.start:misspelling.end] != misspelling.word:
+        raise ValueError(f"'{misspelling.word}' is no longer at "
+                         f"{misspelling.start}.")
+    replacement = match_case(replacement, misspelling.word)
+    new_text = text[:misspelling.start] + replacement + text[misspelling.end:]
+    return new_text, len(replacement) - len(misspelling.word)
+
+
+def shift(misspellings, offset, delta):
+    """Moves the misspellings starting at or after offset by delta."""
+    return [m._replace(start=m.start + delta, end=m.end + delta)
+            if m.start >= offset else m for m in misspellings]
+
+
+class SpellIndex:
+    """Caches spell check verdicts and candidates per word.
+
+    spell is a pyspellchecker SpellChecker, or any object with the same
+    known(), candidates() and word_usage_frequency() methods. Words in the
+    user dictionary are accepted without asking spell. With a
+    SymSpellIndex, the corrections one edit away come from it, and spell's
+    much slower edit generation only runs for words that have none.
+    """
+
+    def __init__(self, spell, user_dictionary=None, symspell=None,
+                 max_candidates=MAX_CANDIDATES):
+        self.spell = spell
+        self.user_dictionary = user_dictionary
+        self.symspell = symspell
+        self.max_candidates = max_candidates
+        self.verdicts = {}
+        self.candidates = {}
+        self.ignored = set()
+        self.lock = threading.Lock()
+
+    def check(self, text):
+        """Returns the misspellings of the text in order of their offsets."""
+        # Numbers and other tokens that are not words are never checked
+        tokens = [token for token in tokenize(text)
+                  if token.norm.replace("'", '').isalpha()]
+        words = {token.norm for token in tokens}
+        with self.lock:
+            self._check_words(words - self.verdicts.keys())
+            return [
+                Misspelling(token.text, token.start, token.end,
+                            self.candidates[token.norm])
+                for token in tokens
+                if not self.verdicts[token.norm]
+                and token.norm not in self.ignored
+            ]
+
+    def _check_words(self, words):
+        """Checks new words in one batch and caches their candidates."""
+        if not words:
+            return
+        if self.user_dictionary is not None:
+            for word in [word for word in words if word in self.user_dictionary]:
+                self.verdicts[word] = True
+                words.discard(word)
+        known = self.spell.known(words)
+        for word in words:
+            self.verdicts[word] = word in known
+            if word not in known:
+                self.candidates[word] = self._find_candidates(word)
+
+    def _find_candidates(self, word):
+        """Returns the best corrections of a misspelled word."""
+        if self.symspell is not None:
+            candidates = self.symspell.lookup(word, self.max_candidates)
+            if candidates:
+                return candidates
+        candidates = (self.spell.candidates(word) or set()) - {word}
+        # Most frequent corrections first
+        return sorted(
+            candidates, key=lambda candidate: (
+                -self.spell.word_usage_frequency(candidate), candidate)
+        )[:self.max_candidates]
+
+    def set_symspell(self, symspell):
+        """Uses a SymSpellIndex for the candidates of later checks."""
+        with self.lock:
+            self.symspell = symspell
+
+    def accept(self, word):
+        """Adds a word to the user dictionary and stops reporting it."""
+        if self.user_dictionary is not None:
+            self.user_dictionary.add(word)
+        with self.lock:
+            self.verdicts[word.lower()] = True
+
+    def ignore(self, word):
+        """Stops reporting a word for the rest of the session."""
+        with self.lock:
+            self.ignored.add(word.lower())
+
+    def clear(self):
+        """Drops every cached verdict, e.g. after the dictionary changed."""
+        with self.lock:
+            self.verdicts.clear()
+            self.candidates.clear()
@@ -0,0 +1,225 @@
+"""
+Module for the staged startup pipeline of the app.
+
+Startup work is split into named tasks that run in parallel on a small
+thread pool, each starting as soon as the tasks it depends on are done.
+Tasks marked as required are the ones the editor needs; once they are all
+done, on_ready is called so the UI can be shown while the remaining tasks
+keep loading in the background. Every task is timed, and report() shows
+where the startup time went.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import traceback
+
+import config
+
+
+class StartupTask:
+    """A named piece of startup work and the tasks it must wait for."""
+
+    def __init__(self, name, function, depends=(), required=True,
+                 description=None):
+        self.name = name
+        self.function = function
+        self.depends = tuple(depends)
+        self.required = required
+        self.description = description or name
+        self.started = None
+        self.finished = None
+        self.thread = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    @property
+    def duration(self):
+        """Returns how long the task ran in seconds, or None."""
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class StartupPipeline:
+    """Runs startup tasks in parallel and reports progress.
+
+    on_progress(fraction, message) is called whenever a task starts or
+    finishes, on_ready() once every required task is done, and
+    on_complete() once every task is done. Callbacks run on the worker
+    threads, so UI code must hand them over to the main thread.
+    """
+
+    def __init__(self, max_workers=config.STARTUP_WORKERS):
+        self.tasks = {}
+        self.max_workers = max_workers
+        self.executor = None
+        self.on_progress = None
+        self.on_ready = None
+        self.on_complete = None
+        self.began = None
+        self.ready_time = None
+        self.complete_time = None
+        self.lock = threading.Lock()
+
+    def add(self, name, function, depends=(), required=True,
+            description=None):
+        """Adds a task; function is called with no arguments."""
+        for dependency in depends:
+            if dependency not in self.tasks:
+                raise ValueError(f"Startup task '{name}' depends on unknown "
+                                 f"task '{dependency}'.")
+        self.tasks[name] = StartupTask(name, function, depends, required,
+                                       description)
+        return self.tasks[name]
+
+    def run(self, on_progress=None, on_ready=None, on_complete=None):
+        """Starts every task whose dependencies are met."""
+        self.on_progress = on_progress
+        self.on_ready = on_ready
+        self.on_complete = on_complete
+        self.began = time.perf_counter()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix='startup')
+        with self.lock:
+            runnable = self._runnable()
+        for task in runnable:
+            self.executor.submit(self._run_task, task)
+        if not self.tasks:
+            self._check_finished()
+
+    def wait(self, name, timeout=None):
+        """Blocks until a task is done; returns its result or raises."""
+        task = self.tasks[name]
+        if not task.done.wait(timeout):
+            raise TimeoutError(f"Startup task '{name}' is still running.")
+        if task.error is not None:
+            raise task.error
+        return task.result
+
+    def is_done(self, name):
+        """Returns True if the task has finished, successfully or not."""
+        return self.tasks[name].done.is_set()
+
+    def error(self, name):
+        """Returns the exception a finished task failed with, or None."""
+        task = self.tasks[name]
+        return task.error if task.done.is_set() else None
+
+    def retry(self, name):
+        """Runs a finished task again on the calling thread.
+
+        Returns its result, or records and raises its error, so error()
+        always reflects the latest attempt.
+        """
+        task = self.tasks[name]
+        if not task.done.is_set():
+            raise RuntimeError(f"Startup task '{name}' is still running.")
+        task.started = time.perf_counter()
+        try:
+            task.result = task.function()
+            task.error = None
+        except Exception as e:
+            task.error = e
+            raise
+        finally:
+            task.finished = time.perf_counter()
+        print(f"Startup task '{name}' retried in {task.duration:.2f}s")
+        return task.result
+
+    def progress(self):
+        """Returns the fraction of tasks that are done."""
+        if not self.tasks:
+            return 1.0
+        done = sum(1 for task in self.tasks.values() if task.done.is_set())
+        return done / len(self.tasks)
+
+    def _runnable(self):
+        """Returns the tasks not yet started whose dependencies are done."""
+        runnable = [task for task in self.tasks.values()
+                    if task.thread is None and all(
+                        self.tasks[name].done.is_set()
+                        for name in task.depends)]
+        for task in runnable:
+            # Mark as scheduled, so it is never submitted twice
+            task.thread = ''
+        return runnable
+
+    def _run_task(self, task):
+        task.thread = threading.current_thread().name
+        task.started = time.perf_counter()
+        self._notify_progress(f"Loading {task.description}...")
+        failed = next((self.tasks[name] for name in task.depends
+                       if self.tasks[name].error is not None), None)
+        try:
+            if failed is not None:
+                raise RuntimeError(f"Depends on failed task '{failed.name}'")
+            task.result = task.function()
+        except Exception as e:
+            task.error = e
+            print(f"Startup task '{task.name}' failed: {e}")
+            if failed is None:
+                traceback.print_exc()
+        task.finished = time.perf_counter()
+        task.done.set()
+        print(f"Startup task '{task.name}' finished in "
+              f"{task.duration:.2f}s")
+
+        with self.lock:
+            runnable = self._runnable()
+        for next_task in runnable:
+            self.executor.submit(self._run_task, next_task)
+        self._notify_progress(f"Loaded {task.description}")
+        self._check_finished()
+
+    def _notify_progress(self, message):
+        if self.on_progress is not None:
+            self.on_progress(self.progress(), message)
+
+    def _check_finished(self):
+        """Calls on_ready and on_complete the first time they apply."""
+        with self.lock:
+            call_ready = self.ready_time is None and all(
+                task.done.is_set() for task in self.tasks.values()
+                if task.required)
+            if call_ready:
+                self.ready_time = time.perf_counter()
+            call_complete = self.complete_time is None and all(
+                task.done.is_set() for task in self.tasks.values())
+            if call_complete:
+                self.complete_time = time.perf_counter()
+        if call_ready and self.on_ready is not None:
+            self.on_ready()
+        if call_complete:
+            print(self.report())
+            self.executor.shutdown(wait=False)
+            if self.on_complete is not None:
+                self.on_complete()
+
+    def report(self):
+        """Returns a table of when each task ran and how long it took."""
+        lines = ["Startup timing report:",
+                 f"{'task':<16} {'start s':>8} {'time s':>8}  "
+                 f"{'thread':<12} status"]
+        for task in sorted(self.tasks.values(),
+                           key=lambda task: task.started or float('inf')):
+            if task.started is None:
+                lines.append(f"{task.name:<16} {'-':>8} {'-':>8}  "
+                             f"{'-':<12} pending")
+                continue
+            duration = task.duration
+            status = ('running' if duration is None
+                      else 'failed' if task.error is not None else 'ok')
+            lines.append(
+                f"{task.name:<16} {task.started - self.began:8.2f} "
+                f"{duration if duration is not None else 0:8.2f}  "
+                f"{task.thread:<12} {status}"
+                f"{'' if task.required else ' (background)'}")
+        if self.ready_time is not None:
+            lines.append(f"Editor ready after "
+                         f"{self.ready_time - self.began:.2f}s")
+        if self.complete_time is not None:
+            lines.append(f"All tasks done after "
+                         f"{self.complete_time - self.began:.2f}s")
+        return '\n'.join(lines)
@@ -0,0 +1,87 @@
+"""
+Module for caching syllable counts of words with LRU eviction.
+"""
+
+from collections import OrderedDict
+import re
+import threading
+
+import config
+
+NON_WORD_PATTERN = re.compile(r"[^a-z']+")
+
+
+def normalize_word(word):
+    """Returns the lowercase form of a word without punctuation."""
+    return NON_WORD_PATTERN.sub('', word.lower()).strip("'")
+
+
+class SyllableCache:
+    """Bounded LRU cache of syllable counts keyed on the normalized word.
+
+    Counts from different counting methods are stored under separate
+    keys, so every syllable path can share one cache and one size limit.
+    """
+
+    def __init__(self, maxsize=config.SYLLABLE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, word, method, counter):
+        """Returns the cached count of a word, computing it on a miss.
+
+        The counter is called with the normalized word and its result is
+        stored under (method, word). Words without letters count as zero.
+        """
+        normalized = normalize_word(word)
+        if not normalized:
+            return 0
+
+        key = (method, normalized)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        count = counter(normalized)
+        with self.lock:
+            self.entries[key] = count
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return count
+
+    def resize(self, maxsize):
+        """Changes the maximum size, evicting the oldest words if needed."""
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Removes all cached counts and resets the statistics."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns the hit/miss statistics of the cache."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+# Shared cache used by every syllable counting path in the app
+syllable_cache = SyllableCache()
@@ -1,21 +1,76 @@
 """
-Module for counting syllables in words and lines using Pyphen.
+Module for counting syllables in words and lines using the pronunciation
+dictionary, with Pyphen and a vowel heuristic as fallbacks.
 """
 
-import pyphen
+import threading
 
-pyphen_dic = pyphen.Pyphen(lang='en')
+from lazy_imports import lazy_import
+from pronunciation_dict import get_dictionary
+from syllable_cache import syllable_cache
+
+pyphen = lazy_import('pyphen')  # Imported when the hyphenator is built
+_hyphenator = None
+_hyphenator_lock = threading.Lock()
+
+VOWELS = 'aeiouy'
+
+
+def get_hyphenator():
+    """Returns the shared Pyphen hyphenator, loading it on first use."""
+    global _hyphenator
+    with _hyphenator_lock:
+        if _hyphenator is None:
+            _hyphenator = pyphen.Pyphen(lang='en')
+        return _hyphenator
+
+
+def _dictionary_syllables(word):
+    """Looks up the syllables of a word in the pronunciation dictionary."""
+    dictionary = get_dictionary()
+    if dictionary is None:
+        return None
+    return dictionary.syllables(word)
+
+
+def _pyphen_syllables(word):
+    """Counts the syllables of a normalized word using Pyphen."""
+    count = _dictionary_syllables(word)
+    if count is not None:
+        return count
+    return len(get_hyphenator().inserted(word).split('-'))
+
+
+def _vowel_syllables(word):
+    """Estimates the syllables of a normalized word from its vowel runs."""
+    count = _dictionary_syllables(word)
+    if count is not None:
+        return count
+    count = 0
+    if word[0] in VOWELS:
+        count += 1
+    for index in range(1, len(word)):
+        if word[index] in VOWELS and word[index - 1] not in VOWELS:
+            count += 1
+    if word.endswith('e'):
+        count -= 1
+    if word.endswith('le'):
+        count += 1
+    if count == 0:
+        count += 1
+    return count
 
 
 def count_syllables(word):
     """Returns the syllable count of a word using Pyphen."""
-    word = word.lower()
-    syllables = pyphen_dic.inserted(word).split('-')
-    return len(syllables)
+    return syllable_cache.get(word, 'pyphen', _pyphen_syllables)
+
+
+def estimate_syllables(word):
+    """Returns a vowel-based estimate of the syllable count of a word."""
+    return syllable_cache.get(word, 'vowel', _vowel_syllables)
 
 
 def count_syllables_in_line(line):
     """Returns the total syllable count of a line."""
-    line = line.lower()
-    syllables = pyphen_dic.inserted(line).split('-')
-    return len(syllables)
+    return sum(count_syllables(word) for word in line.split())
@@ -1,11 +1,43 @@
-from textblob import TextBlob
+"""
+Module for analyzing the sentiment of lyrics with TextBlob.
+
+Batches of texts are deduplicated by content hash, looked up in a
+persistent cache, and the remaining texts are scored in chunks on a
+process pool, so scoring a whole library scales with the number of cores.
+
+SentimentTimeline scores a song bar by bar and section by section,
+caching each line's score so an edit only re-scores the changed lines.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+from itertools import islice
+import os
+import re
+import threading
+
+import config
+from lazy_imports import lazy_import
+from response_cache import ResponseCache
+
+textblob = lazy_import('textblob')  # Imported on first analysis
+
+CACHE_ENDPOINT = 'sentiment'
+SECTION_HEADER_PATTERN = re.compile(
+    r'^\s*[\[(]?\s*(' + '|'.join(re.escape(part)
+                              for part in config.DEFAULT_SONG_PARTS)
+    + r')\s*[\])]?\s*:?\s*$', re.IGNORECASE)
+
+_sentiment_cache = None
+_sentiment_cache_lock = threading.Lock()
 
 
 def analyze_sentiment(text):
     """Analyzes the sentiment of the provided text."""
     if not text:
         raise ValueError("Input text cannot be empty.")
-    sentiment = TextBlob(text).sentiment
+    sentiment = textblob.TextBlob(text).sentiment
     return {
         'polarity': sentiment.polarity,
         'subjectivity': sentiment.subjectivity
@@ -13,5 +45,193 @@ def analyze_sentiment(text):
 
 
 def analyze_sentiments(texts):
-    """Analyzes the sentiment of a list of texts."""
-    return {text: analyze_sentiment(text) for text in texts}
+    """Analyzes the sentiment of a list of texts.
+
+    Returns {text: sentiment}, scored through iter_sentiments(). Raises
+    ValueError if a text is empty.
+    """
+    texts = list(texts)
+    if not all(texts):
+        raise ValueError("Input text cannot be empty.")
+    return dict(zip(texts, iter_sentiments(texts)))
+
+
+def content_hash(text):
+    """Returns a short hash identifying a text's content."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def get_sentiment_cache():
+    """Returns the shared persistent sentiment cache."""
+    global _sentiment_cache
+    with _sentiment_cache_lock:
+        if _sentiment_cache is None:
+            app_dir = os.path.join(os.path.expanduser("~"), config.BASE_DIR)
+            os.makedirs(app_dir, exist_ok=True)
+            _sentiment_cache = ResponseCache(
+                os.path.join(app_dir, config.SENTIMENT_CACHE_FILE),
+                ttl=config.SENTIMENT_CACHE_TTL,
+                max_bytes=config.SENTIMENT_CACHE_MAX_BYTES)
+        return _sentiment_cache
+
+
+def score_chunk(texts):
+    """Scores a chunk of texts; runs in the worker processes."""
+    return [analyze_sentiment(text) for text in texts]
+
+
+def iter_sentiments(texts, chunk_size=config.SENTIMENT_CHUNK_SIZE,
+                    max_workers=config.SENTIMENT_WORKERS, cache=None):
+    """Yields the sentiment of each text, in input order.
+
+    Empty texts yield None. Texts are read in windows, so any iterable,
+    however long, is streamed. Within a window each distinct text is
+    scored once: cached scores are reused, and the rest are split into
+    chunks of chunk_size and scored on a pool of max_workers processes
+    (all cores by default). A window with a single chunk is scored in
+    this process, since starting the pool would cost more.
+    """
+    cache = cache if cache is not None else get_sentiment_cache()
+    workers = max_workers or os.cpu_count() or 1
+    window_size = chunk_size * workers * 4
+    texts = iter(texts)
+    executor = None
+    futures = []
+    try:
+        while True:
+            window = list(islice(texts, window_size))
+            if not window:
+                return
+            hashes = [content_hash(text) if text else None for text in window]
+            unique = {key: text for key, text in zip(hashes, window) if key}
+            scores = cache.get_many(CACHE_ENDPOINT, unique)
+
+            missing = [key for key in unique if key not in scores]
+            chunks = [missing[start:start + chunk_size]
+                      for start in range(0, len(missing), chunk_size)]
+            if len(chunks) > 1 and workers > 1:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                futures = [executor.submit(score_chunk,
+                                           [unique[key] for key in chunk])
+                           for chunk in chunks]
+                results = (future.result() for future in futures)
+            else:
+                results = (score_chunk([unique[key] for key in chunk])
+                           for chunk in chunks)
+            new_scores = {}
+            for chunk, chunk_scores in zip(chunks, results):
+                new_scores.update(zip(chunk, chunk_scores))
+            if new_scores:
+                cache.set_many(CACHE_ENDPOINT, new_scores)
+                scores.update(new_scores)
+
+            for key in hashes:
+                yield scores[key] if key else None
+    finally:
+        if executor is not None:
+            # Drop the chunks not started yet if the caller stopped early
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+
+def section_name(line):
+    """Returns the song part a header line starts, or None.
+
+    Headers are a name from config.DEFAULT_SONG_PARTS on its own line,
+    optionally in brackets or followed by a colon, such as '[Chorus]'.
+    """
+    match = SECTION_HEADER_PATTERN.match(line)
+    if match is None:
+        return None
+    name = match.group(1).lower()
+    return next(part for part in config.DEFAULT_SONG_PARTS
+                if part.lower() == name)
+
+
+def average_sentiment(scores):
+    """Returns the mean polarity and subjectivity of a list of scores."""
+    if not scores:
+        return {'polarity': 0.0, 'subjectivity': 0.0}
+    return {
+        'polarity': sum(score['polarity'] for score in scores) / len(scores),
+        'subjectivity': sum(score['subjectivity']
+                            for score in scores) / len(scores)
+    }
+
+
+class SentimentTimeline:
+    """Scores the sentiment of every bar and section of a song.
+
+    Line scores are kept in an LRU cache keyed by the hash of the line,
+    so after an edit only new or changed lines are scored. Section scores
+    are the mean of their bars' scores.
+    """
+
+    def __init__(self, scorer=analyze_sentiment,
+                 max_lines=config.SENTIMENT_LINE_CACHE_SIZE):
+        self.scorer = scorer
+        self.max_lines = max_lines
+        self.line_scores = OrderedDict()
+        self.lock = threading.Lock()
+
+    def update(self, text):
+        """Returns the sentiment timeline of the text.
+
+        The result holds 'lines', one entry per bar with its line index,
+        section, polarity and subjectivity, and 'sections', one entry per
+        song part with its line range and mean scores. Bars before the
+        first section header belong to a section named None. Empty text
+        gives an empty timeline.
+        """
+        bars = []
+        sections = []
+        current = None
+        with self.lock:
+            for index, line in enumerate(text.split('\n')):
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                name = section_name(stripped)
+                if name is not None or current is None:
+                    current = {'name': name, 'start_line': index,
+                               'end_line': index, 'scores': []}
+                    sections.append(current)
+                    if name is not None:
+                        continue
+                score = self._line_score(stripped)
+                current['scores'].append(score)
+                current['end_line'] = index
+                bars.append(dict(score, line=index, section=current['name']))
+
+        for section in sections:
+            scores = section.pop('scores')
+            section['bars'] = len(scores)
+            section.update(average_sentiment(scores))
+        return {'lines': bars, 'sections': sections}
+
+    def _line_score(self, line):
+        key = content_hash(line)
+        score = self.line_scores.get(key)
+        if score is None:
+            score = self.scorer(line)
+            self.line_scores[key] = score
+            if len(self.line_scores) > self.max_lines:
+                self.line_scores.popitem(last=False)
+        else:
+            self.line_scores.move_to_end(key)
+        return score
+
+    def clear(self):
+        """Drops every cached line score."""
+        with self.lock:
+            self.line_scores.clear()
+
+
+sentiment_timeline = SentimentTimeline()
+
+
+def analyze_timeline(text):
+    """Returns the per-bar and per-section sentiment timeline of a song."""
+    return sentiment_timeline.update(text)
@@ -0,0 +1,126 @@
+"""
+Module with the shared tokenizer for lyrics text.
+
+tokenize() splits a text into a TokenTable: for every line, the spans of
+its words and their lowercase forms. Lines are tokenized once and cached,
+and the table of the last text is kept, so every analyzer that looks at
+the same text after an edit shares one tokenization, and an edit only
+tokenizes the lines it changed.
+"""
+
+from collections import OrderedDict, namedtuple
+import re
+import threading
+
+import config
+
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+Token = namedtuple('Token', ['start', 'end', 'text', 'norm', 'line'])
+
+
+def tokenize_line(line):
+    """Returns the (start, end, lowercase word) spans of a line's words."""
+    return tuple((match.start(), match.end(), match.group().lower())
+                 for match in WORD_PATTERN.finditer(line))
+
+
+def changed_line_range(old_lines, new_lines):
+    """Returns (start, old_end, new_end) of the lines that differ.
+
+    The lines before start and after the ends are unchanged.
+    """
+    start = 0
+    max_start = min(len(old_lines), len(new_lines))
+    while start < max_start and old_lines[start] == new_lines[start]:
+        start += 1
+    old_end, new_end = len(old_lines), len(new_lines)
+    while (old_end > start and new_end > start
+           and old_lines[old_end - 1] == new_lines[new_end - 1]):
+        old_end -= 1
+        new_end -= 1
+    return start, old_end, new_end
+
+
+class TokenTable:
+    """The words of a text, by line.
+
+    line_tokens[i] holds the (start, end, lowercase word) spans of
+    lines[i], with offsets relative to the line; line_starts[i] is the
+    offset of the line in the text.
+    """
+
+    def __init__(self, text, lines, line_tokens):
+        self.text = text
+        self.lines = lines
+        self.line_tokens = line_tokens
+        self.line_starts = []
+        offset = 0
+        for line in lines:
+            self.line_starts.append(offset)
+            offset += len(line) + 1
+
+    def __len__(self):
+        return sum(len(tokens) for tokens in self.line_tokens)
+
+    def __iter__(self):
+        """Yields every Token, with offsets in the whole text."""
+        for index, (line, tokens) in enumerate(zip(self.lines,
+                                                   self.line_tokens)):
+            line_start = self.line_starts[index]
+            for start, end, norm in tokens:
+                yield Token(line_start + start, line_start + end,
+                            line[start:end], norm, index)
+
+    def words(self):
+        """Returns the lowercase words of the text, in order."""
+        return [norm for tokens in self.line_tokens for _, _, norm in tokens]
+
+    def line_words(self, index):
+        """Returns the lowercase words of one line."""
+        return [norm for _, _, norm in self.line_tokens[index]]
+
+
+class Tokenizer:
+    """Tokenizes texts, caching the tokens of recently seen lines."""
+
+    def __init__(self, max_lines=config.TOKEN_CACHE_LINES):
+        self.max_lines = max_lines
+        self.line_cache = OrderedDict()
+        self.last_table = None
+        self.lock = threading.Lock()
+
+    def tokenize(self, text):
+        """Returns the TokenTable of a text."""
+        with self.lock:
+            if self.last_table is not None and self.last_table.text == text:
+                return self.last_table
+            lines = text.split('\n')
+            line_tokens = [self._line_tokens(line) for line in lines]
+            self.last_table = TokenTable(text, lines, line_tokens)
+            return self.last_table
+
+    def _line_tokens(self, line):
+        tokens = self.line_cache.get(line)
+        if tokens is None:
+            tokens = tokenize_line(line)
+            self.line_cache[line] = tokens
+            if len(self.line_cache) > self.max_lines:
+                self.line_cache.popitem(last=False)
+        else:
+            self.line_cache.move_to_end(line)
+        return tokens
+
+    def clear(self):
+        """Drops every cached line."""
+        with self.lock:
+            self.line_cache.clear()
+            self.last_table = None
+
+
+tokenizer = Tokenizer()
+
+
+def tokenize(text):
+    """Returns the TokenTable of a text from the shared tokenizer."""
+    return tokenizer.tokenize(text)
@@ -1,31 +1,100 @@
 # undo_redo.py
+"""
+Undo/redo history that stores edits instead of copies of the document.
+
+Each history entry records only the changed span: where it starts, the
+text it removed and the text it inserted. The entries are exact inverses
+of each other, so undoing or redoing applies one of them to the current
+text, and the history is bounded by the bytes its entries hold rather
+than by their number.
+
+DebouncedCapture decides when the text is saved: a burst of typing
+becomes one entry, and a new entry starts at each word boundary.
+"""
+
+from collections import deque, namedtuple
+import time
+
+import config
+
+ENTRY_OVERHEAD = 64  # Approximate bytes an entry costs besides its text
+
+Edit = namedtuple('Edit', ['start', 'removed', 'inserted'])
+
+
+def diff(old, new):
+    """Returns the Edit turning old into new, or None if they are equal."""
+    if old == new:
+        return None
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and \
+            old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    return Edit(start, old[start:old_end], new[start:new_end])
+
+
+def apply_edit(text, edit):
+    """Applies an edit to the text it was computed from."""
+    return text[:edit.start] + edit.inserted + \
+        text[edit.start + len(edit.removed):]
+
+
+def invert(edit):
+    """Returns the edit that undoes the given edit."""
+    return Edit(edit.start, edit.inserted, edit.removed)
+
+
+def edit_size(edit):
+    """Returns the approximate memory an edit holds, in bytes."""
+    return (ENTRY_OVERHEAD + len(edit.removed.encode('utf-8'))
+            + len(edit.inserted.encode('utf-8')))
 
-from collections import deque
 
 class UndoRedoManager:
-    def __init__(self, max_history=50):
-        self.undo_stack = deque(maxlen=max_history)
-        self.redo_stack = deque(maxlen=max_history)
+    """Undo/redo history of a text, bounded to max_bytes of edits."""
+
+    def __init__(self, max_bytes=config.UNDO_HISTORY_BYTES):
+        self.max_bytes = max_bytes
+        # Undo entries turn the current state into the previous one, redo
+        # entries turn it into the next one
+        self.undo_stack = deque()
+        self.redo_stack = deque()
+        self.history_bytes = 0
         self.current_state = ""
         self.last_saved_state = ""
 
-    def save_state(self, state):
-        if state != self.current_state:
-            self.undo_stack.append(self.current_state)
-            self.redo_stack.clear()
-            self.current_state = state
+    def save_state(self, state, merge=False):
+        """Saves the text; with merge, the change joins the last entry."""
+        if state == self.current_state:
+            return
+        base = self.current_state
+        if merge and self.undo_stack and not self.redo_stack:
+            base = apply_edit(base, self._pop(self.undo_stack))
+        edit = diff(base, state)
+        self._clear_redo()
+        if edit is not None:
+            self._push(self.undo_stack, invert(edit))
+        self.current_state = state
+        self._trim()
 
     def undo(self):
         if self.undo_stack:
-            self.redo_stack.append(self.current_state)
-            self.current_state = self.undo_stack.pop()
+            edit = self._pop(self.undo_stack)
+            self._push(self.redo_stack, invert(edit))
+            self.current_state = apply_edit(self.current_state, edit)
             return self.current_state
         return None
 
     def redo(self):
         if self.redo_stack:
-            self.undo_stack.append(self.current_state)
-            self.current_state = self.redo_stack.pop()
+            edit = self._pop(self.redo_stack)
+            self._push(self.undo_stack, invert(edit))
+            self.current_state = apply_edit(self.current_state, edit)
             return self.current_state
         return None
 
@@ -33,4 +102,105 @@ class UndoRedoManager:
         return bool(self.undo_stack)
 
     def can_redo(self):
-        return bool(self.redo_stack)
\ No newline at end of file
+        return bool(self.redo_stack)
+
+    def _push(self, stack, edit):
+        stack.append(edit)
+        self.history_bytes += edit_size(edit)
+
+    def _pop(self, stack):
+        edit = stack.pop()
+        self.history_bytes -= edit_size(edit)
+        return edit
+
+    def _clear_redo(self):
+        while self.redo_stack:
+            self._pop(self.redo_stack)
+
+    def _trim(self):
+        """Forgets the oldest edits until the history fits in max_bytes.
+
+        The newest edit is always kept, so the last change can be undone.
+        """
+        while self.history_bytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.history_bytes -= edit_size(self.undo_stack.popleft())
+
+
+def ends_word(edit):
+    """Returns True if the edit typed a character that ends a word."""
+    return (edit is not None and not edit.removed and edit.inserted != ''
+            and not (edit.inserted[-1].isalnum() or edit.inserted[-1] == "'"))
+
+
+class DebouncedCapture:
+    """Saves typing to the history once it pauses, merging bursts.
+
+    text_changed() is called on every change. The text is saved after
+    delay seconds without changes, through schedule(callback, delay),
+    which must return an event with a cancel() method, such as Kivy's
+    Clock.schedule_once; only one capture is ever pending. A capture made
+    within merge_window seconds of the previous one joins its entry,
+    unless a word ended in between, so undo steps back a word at a time.
+    """
+
+    def __init__(self, manager, schedule, delay=config.UNDO_CAPTURE_DELAY,
+                 merge_window=config.UNDO_MERGE_WINDOW, on_capture=None,
+                 clock=time.monotonic):
+        self.manager = manager
+        self.schedule = schedule
+        self.delay = delay
+        self.merge_window = merge_window
+        self.on_capture = on_capture
+        self.clock = clock
+        self.pending = None
+        self.pending_text = None
+        self.last_text = manager.current_state
+        self.last_capture = None
+        self.word_ended = True
+
+    def text_changed(self, text):
+        """Schedules the text to be saved, replacing any pending capture."""
+        edit = diff(self.last_text, text)
+        if edit is None:
+            return
+        self.last_text = text
+        self.pending_text = text
+        self.cancel()
+        if ends_word(edit):
+            # Save the finished word now; the next one starts a new entry
+            self.flush()
+            self.word_ended = True
+        else:
+            self.pending = self.schedule(self._on_timer, self.delay)
+
+    def flush(self):
+        """Saves the pending text right away."""
+        self.cancel()
+        if self.pending_text is None:
+            return
+        now = self.clock()
+        merge = (not self.word_ended and self.last_capture is not None
+                 and now - self.last_capture <= self.merge_window)
+        self.manager.save_state(self.pending_text, merge=merge)
+        self.pending_text = None
+        self.last_capture = now
+        self.word_ended = False
+        if self.on_capture is not None:
+            self.on_capture()
+
+    def cancel(self):
+        """Cancels the pending timer, keeping the pending text."""
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
+
+    def sync(self, text):
+        """Drops pending typing after the text was set by undo or redo."""
+        self.cancel()
+        self.pending_text = None
+        self.last_text = text
+        self.word_ended = True
+
+    def _on_timer(self, *args):
+        self.pending = None
+        self.flush()
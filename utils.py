@@ -1,6 +1,15 @@
-import re
+import array
+import os
 import string
 
+from lazy_imports import lazy_import
+from tokenizer import WORD_PATTERN, tokenize
+
+np = lazy_import('numpy')  # Imported on first corpus analysis
+
+CORPUS_COLUMNS = ('words', 'lines', 'sentences', 'characters',
+                  'avg_word_length', 'readability')
+
 def format_output(text):
     """Utility function to format text output."""
     return ' '.join(text.split())
@@ -12,8 +21,7 @@ def validate_input(input_text):
 
 def count_words(text):
     """Counts the number of words in the given text."""
-    words = re.findall(r'\b\w+\b', text)
-    return len(words)
+    return len(tokenize(text))
 
 def count_lines(text):
     """Counts the number of non-empty lines in the given text."""
@@ -31,7 +39,7 @@ def remove_punctuation(text):
 
 def calculate_average_word_length(text):
     """Calculates the average word length in the given text."""
-    words = re.findall(r'\b\w+\b', text)
+    words = tokenize(text).words()
     if not words:
         return 0
     total_length = sum(len(word) for word in words)
@@ -43,4 +51,74 @@ def calculate_readability_score(text):
     sentences = text.count('.') + text.count('!') + text.count('?')
     if sentences == 0:
         sentences = 1  # To avoid division by zero if no sentences are found
-    return words / sentences
\ No newline at end of file
+    return words / sentences
+
+def song_counts(text):
+    """Returns the (words, lines, sentences, word characters) of a song."""
+    words = WORD_PATTERN.findall(text)
+    lines = sum(1 for line in text.split('\n') if line.strip())
+    sentences = text.count('.') + text.count('!') + text.count('?')
+    return len(words), lines, sentences, sum(map(len, words))
+
+def iter_songs(source):
+    """Yields the (name, text) of every song in a corpus.
+
+    source is a directory, whose .txt files are read in name order, or an
+    iterable of texts or of (name, text) pairs.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        for name in sorted(os.listdir(source)):
+            if name.endswith('.txt'):
+                with open(os.path.join(source, name), 'r',
+                          encoding='utf-8') as file:
+                    yield name, file.read()
+        return
+    for index, song in enumerate(source):
+        yield song if isinstance(song, tuple) else (str(index), song)
+
+def analyze_corpus(source):
+    """Computes the metrics of every song of a corpus in one pass.
+
+    Returns a columnar table: a dict with the song names under 'name' and
+    a NumPy array per metric in CORPUS_COLUMNS, one row per song. The
+    per-song metrics match count_words, count_lines,
+    calculate_average_word_length and calculate_readability_score.
+    """
+    names = []
+    # Typed arrays keep the counts compact while songs are streamed in
+    counts = {column: array.array('q')
+              for column in ('words', 'lines', 'sentences', 'characters')}
+    for name, text in iter_songs(source):
+        names.append(name)
+        words, lines, sentences, characters = song_counts(text)
+        counts['words'].append(words)
+        counts['lines'].append(lines)
+        counts['sentences'].append(sentences)
+        counts['characters'].append(characters)
+
+    table = {'name': names}
+    for column, values in counts.items():
+        table[column] = np.frombuffer(values, dtype=np.int64) if values \
+            else np.zeros(0, dtype=np.int64)
+    words = table['words']
+    table['avg_word_length'] = np.divide(
+        table['characters'], words, out=np.zeros(len(words)),
+        where=words > 0)
+    table['readability'] = words / np.maximum(table['sentences'], 1)
+    return table
+
+def summarize_corpus(table):
+    """Returns corpus-wide totals and per-song averages of a table."""
+    songs = len(table['name'])
+    summary = {'songs': songs}
+    for column in ('words', 'lines', 'sentences'):
+        summary[f'total_{column}'] = int(table[column].sum())
+    for column in CORPUS_COLUMNS:
+        values = table[column]
+        summary[f'mean_{column}'] = float(values.mean()) if songs else 0.0
+        summary[f'median_{column}'] = (float(np.median(values))
+                                       if songs else 0.0)
+    total_words = summary['total_words']
+    summary['avg_word_length'] = (int(table['characters'].sum()) / total_words
+                                  if total_words else 0.0)
+    return summary